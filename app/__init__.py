@@ -1,7 +1,9 @@
 from flask import Flask
 from flask_restful import Api
+from . import admission, analytics, read_model, response_cache
+from .compression import compress_response
 from .config import Config
-from .database import engine, Base
+from .database import engine, Base, SessionLocal
 from .routes import initialize_routes
 from dotenv import load_dotenv
 
@@ -16,6 +18,20 @@ def create_app():
 
     Base.metadata.create_all(bind=engine)
 
+    if app.config['READ_MODEL']:
+        read_model.load(engine, app.config['READ_MODEL_REFRESH_SECONDS'])
+
+    analytics.track_writes(SessionLocal)
+
+    if app.config['RESPONSE_CACHE']:
+        response_cache.enable(app.config['RESPONSE_CACHE_MAX_BYTES'], app.config['RESPONSE_CACHE_SECONDS'])
+
+    if app.config['COMPRESSION']:
+        app.after_request(compress_response)
+
+    if app.config['ADMISSION_CONTROL']:
+        admission.init_app(app)
+
     api = Api(app)
 
     initialize_routes(api)
@@ -0,0 +1,160 @@
+"""
+Admission control (ADMISSION_CONTROL=true): caps the number of requests running at once per route class so a traffic
+spike queues briefly in front of the application instead of piling onto the database connection pool.
+
+Requests are classified as cheap reads (single rows), heavy lists (rosters, listings, analytics) and writes. Each class
+admits up to its limit; further requests wait in a short bounded queue for at most ADMISSION_QUEUE_TIMEOUT_MS. When the
+queue is full or the wait times out the request fails fast with 503 and a Retry-After header. Admin endpoints are
+never limited. Queue depth and rejection counters are served at GET /admin/admission.
+"""
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+READ = 'read'
+LIST = 'list'
+WRITE = 'write'
+
+_WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class Limiter:
+    """
+    Counting semaphore with a bounded wait queue and counters. Thread-safe.
+    """
+
+    def __init__(self, limit, queue_size, queue_timeout):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.reset()
+
+    def reset(self):
+        with self._condition:
+            self.admitted = 0
+            self.queued = 0
+            self.rejected_queue_full = 0
+            self.rejected_timeout = 0
+            self.peak_in_flight = self.in_flight
+            self.peak_waiting = self.waiting
+            self.wait_seconds = 0.0
+
+    def acquire(self):
+        """
+        Returns True once the request may run, or False if it was rejected.
+        """
+        with self._condition:
+            if self.in_flight < self.limit and not self.waiting:
+                self._admit()
+                return True
+            if self.waiting >= self.queue_size:
+                self.rejected_queue_full += 1
+                return False
+
+            self.queued += 1
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            started = time.monotonic()
+            admitted = self._condition.wait_for(lambda: self.in_flight < self.limit, self.queue_timeout)
+            self.waiting -= 1
+            self.wait_seconds += time.monotonic() - started
+            if not admitted:
+                self.rejected_timeout += 1
+                return False
+            self._admit()
+            return True
+
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def report(self):
+        with self._condition:
+            rejected = self.rejected_queue_full + self.rejected_timeout
+            return {
+                'limit': self.limit,
+                'queue_size': self.queue_size,
+                'queue_timeout_ms': self.queue_timeout * 1000,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'peak_in_flight': self.peak_in_flight,
+                'peak_waiting': self.peak_waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': rejected,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_timeout': self.rejected_timeout,
+                'avg_queue_wait_ms': round(self.wait_seconds / self.queued * 1000, 3) if self.queued else None,
+            }
+
+
+limiters = {}
+
+
+def request_class():
+    """
+    Returns the class of the current request, or None if it is not limited. Resources set admission_class to LIST or
+    to None (admin endpoints); otherwise GETs are cheap reads and everything else is a write.
+    """
+    view = current_app.view_functions.get(request.endpoint)
+    view_class = getattr(view, 'view_class', None)
+    if view_class is None or request.method == 'OPTIONS':
+        return None
+    if request.method in _WRITE_METHODS:
+        return WRITE if getattr(view_class, 'admission_class', READ) is not None else None
+    return getattr(view_class, 'admission_class', READ)
+
+
+def _admit_request():
+    limiter = limiters.get(request_class())
+    if limiter is None:
+        return None
+    if not limiter.acquire():
+        response = jsonify({'message': 'Server is overloaded, please retry later'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(current_app.config['ADMISSION_RETRY_AFTER'])
+        return response
+    g.admission_limiter = limiter
+    return None
+
+
+def _release_request(exception):
+    limiter = g.pop('admission_limiter', None)
+    if limiter is not None:
+        limiter.release()
+
+
+def init_app(app):
+    """
+    Creates the per-class limiters from the config and installs the request hooks.
+    """
+    config = app.config
+    queue_size = config['ADMISSION_QUEUE_SIZE']
+    queue_timeout = config['ADMISSION_QUEUE_TIMEOUT_MS'] / 1000
+    limiters.clear()
+    limiters.update({
+        READ: Limiter(config['ADMISSION_READ_LIMIT'], queue_size, queue_timeout),
+        LIST: Limiter(config['ADMISSION_LIST_LIMIT'], queue_size, queue_timeout),
+        WRITE: Limiter(config['ADMISSION_WRITE_LIMIT'], queue_size, queue_timeout),
+    })
+    app.before_request(_admit_request)
+    app.teardown_request(_release_request)
+
+
+def report():
+    return {name: limiter.report() for name, limiter in limiters.items()}
+
+
+def reset():
+    for limiter in limiters.values():
+        limiter.reset()
@@ -0,0 +1,254 @@
+"""
+Enrollment analytics computed with NumPy: the course co-enrollment matrix (how many students take both course A and
+course B) and per-group course distributions.
+
+The student_courses pairs are loaded once as integer arrays and both results are computed with vectorized operations.
+They are cached until any session commits a write, or for at most ANALYTICS_CACHE_SECONDS, because the cache is per
+process and other workers' writes are not seen otherwise.
+"""
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import event, func, select
+
+from .models import Group, Student, Course, student_courses
+
+# Above this many cells the counts are gathered with np.unique instead of a dense np.bincount
+_DENSE_LIMIT = 1 << 22
+
+_compute_lock = threading.Lock()
+_cache = None
+_version = 0
+
+
+def _count_pairs(rows, cols, n_cols):
+    """
+    Counts (row, col) pairs. Returns parallel arrays of the distinct rows, cols and their counts.
+    """
+    keys = rows.astype(np.int64) * n_cols + cols
+    if len(keys) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    if keys.max() < _DENSE_LIMIT:
+        counts = np.bincount(keys)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(keys, return_counts=True)
+    return keys // n_cols, keys % n_cols, counts
+
+
+def co_enrollment(student_index, course_index, n_courses):
+    """
+    Returns (course_a, course_b, students) for every pair of courses with a < b that share at least one student,
+    plus the number of students per course.
+
+    Enrollments are grouped by student; for a student with k courses every one of their enrollments is repeated k
+    times and paired with each of the student's courses, which yields all k * k course pairs without a Python loop.
+    """
+    course_totals = np.bincount(course_index, minlength=n_courses)
+    if len(student_index) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, course_totals
+
+    order = np.argsort(student_index, kind='stable')
+    students = student_index[order]
+    courses = course_index[order]
+
+    starts = np.flatnonzero(np.r_[True, students[1:] != students[:-1]])
+    sizes = np.diff(np.r_[starts, len(students)])
+    # Students with a single course have no pairs
+    block = np.repeat(np.arange(len(starts)), sizes)
+    keep = sizes[block] > 1
+    enrollment = np.flatnonzero(keep)
+    block = block[keep]
+
+    repeats = sizes[block]
+    left = np.repeat(enrollment, repeats)
+    first_of_repeat = np.repeat(np.cumsum(repeats) - repeats, repeats)
+    partner = np.repeat(starts[block], repeats) + (np.arange(len(left)) - first_of_repeat)
+
+    a = courses[left]
+    b = courses[partner]
+    upper = a < b
+    course_a, course_b, counts = _count_pairs(a[upper], b[upper], n_courses)
+    return course_a, course_b, counts, course_totals
+
+
+def _int_pairs(rows):
+    """
+    Returns rows of two integers as an (n, 2) int64 array. Accepts such an array or any iterable of pairs; None
+    becomes -1.
+    """
+    if isinstance(rows, np.ndarray):
+        return rows.reshape(-1, 2)
+    return np.fromiter((-1 if value is None else value for value in chain.from_iterable(rows)),
+                       dtype=np.int64).reshape(-1, 2)
+
+
+def _fetch_int_pairs(connection, statement):
+    """
+    Runs a SELECT of two integer columns on the driver cursor and returns an (n, 2) int64 array. Skipping
+    SQLAlchemy's Row objects makes loading a million enrollments several times faster.
+    """
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(sql)
+        return np.fromiter(chain.from_iterable(cursor), dtype=np.int64).reshape(-1, 2)
+    finally:
+        cursor.close()
+
+
+def group_course_counts(group_index, course_index, n_courses):
+    """
+    Returns (group, course, students) for every group/course combination with at least one student.
+    Enrollments of students without a group must be filtered out by the caller.
+    """
+    return _count_pairs(group_index, course_index, n_courses)
+
+
+class EnrollmentArrays:
+    """
+    The enrollment graph as dense integer indices into the groups and courses tables.
+    """
+
+    def __init__(self, groups, courses, students, enrollments):
+        self.group_ids = np.array([row[0] for row in groups], dtype=np.int64)
+        self.group_names = [row[1] for row in groups]
+        self.course_ids = np.array([row[0] for row in courses], dtype=np.int64)
+        self.course_names = [row[1] for row in courses]
+
+        group_order = np.argsort(self.group_ids)
+        course_order = np.argsort(self.course_ids)
+        students = _int_pairs(students)
+        student_ids = students[:, 0]
+        student_groups = students[:, 1]
+        student_order = np.argsort(student_ids)
+        student_ids = student_ids[student_order]
+        student_groups = student_groups[student_order]
+
+        # Row of each student's group in the groups table, -1 for students without one
+        known = np.isin(student_groups, self.group_ids)
+        student_group_index = np.full(len(student_ids), -1, dtype=np.int64)
+        student_group_index[known] = group_order[np.searchsorted(self.group_ids[group_order], student_groups[known])]
+        self.group_sizes = np.bincount(student_group_index[known], minlength=len(self.group_ids))
+
+        pairs = _int_pairs(enrollments)
+        # Drop enrollments of students or courses that are not in the loaded rows (created or deleted while loading
+        # outside a snapshot), so searchsorted below only looks up ids that exist
+        pairs = pairs[np.isin(pairs[:, 0], student_ids) & np.isin(pairs[:, 1], self.course_ids)]
+        self.student_index = np.searchsorted(student_ids, pairs[:, 0])
+        self.course_index = course_order[np.searchsorted(self.course_ids[course_order], pairs[:, 1])]
+
+        enrolled_groups = student_group_index[self.student_index]
+        grouped = enrolled_groups >= 0
+        self.group_index = enrolled_groups[grouped]
+        self.grouped_course_index = self.course_index[grouped]
+
+    @classmethod
+    def load(cls, engine):
+        with engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                # One snapshot for all four queries
+                connection.execution_options(isolation_level='REPEATABLE READ')
+            groups = connection.execute(select(Group.id, Group.name)).all()
+            courses = connection.execute(select(Course.id, Course.name)).all()
+            # Students without a group are read as -1, because the arrays cannot hold NULL
+            students = _fetch_int_pairs(connection, select(Student.id, func.coalesce(Student.group_id, -1)))
+            enrollments = _fetch_int_pairs(
+                connection, select(student_courses.c.student_id, student_courses.c.course_id)
+            )
+        return cls(groups, courses, students, enrollments)
+
+
+class _Results:
+    def __init__(self, arrays):
+        self.loaded_at = time.monotonic()
+        self.arrays = arrays
+        started = time.perf_counter()
+        n_courses = len(arrays.course_ids)
+        self.course_a, self.course_b, self.pair_counts, self.course_totals = co_enrollment(
+            arrays.student_index, arrays.course_index, n_courses
+        )
+        order = np.argsort(-self.pair_counts, kind='stable')
+        self.course_a, self.course_b, self.pair_counts = (
+            self.course_a[order], self.course_b[order], self.pair_counts[order]
+        )
+        self.group_rows, self.group_cols, self.group_counts = group_course_counts(
+            arrays.group_index, arrays.grouped_course_index, n_courses
+        )
+        self.compute_ms = (time.perf_counter() - started) * 1000
+
+
+def invalidate():
+    """
+    Drops the cached results. Bumping the version also stops a computation that is already running from publishing
+    results loaded before the write.
+    """
+    global _cache, _version
+    _version += 1
+    _cache = None
+
+
+def _is_fresh(cached, max_age):
+    return cached is not None and (not max_age or time.monotonic() - cached.loaded_at < max_age)
+
+
+def results(engine, max_age):
+    """
+    Returns the cached results, loading and computing them once per change. Concurrent callers wait for a single
+    computation instead of each running their own.
+    """
+    global _cache
+    cached = _cache
+    if _is_fresh(cached, max_age):
+        return cached
+    with _compute_lock:
+        cached = _cache
+        if _is_fresh(cached, max_age):
+            return cached
+        version = _version
+        computed = _Results(EnrollmentArrays.load(engine))
+        if version == _version:
+            _cache = computed
+        return computed
+
+
+def co_enrollment_report(engine, max_age, min_count=1, limit=None):
+    cached = results(engine, max_age)
+    names = cached.arrays.course_names
+    selected = np.flatnonzero(cached.pair_counts >= min_count)
+    if limit is not None:
+        selected = selected[:limit]
+    return {
+        'courses': [{'id': int(course_id), 'name': names[i], 'students': int(cached.course_totals[i])}
+                    for i, course_id in enumerate(cached.arrays.course_ids)],
+        'pairs': [{'course_a': names[a], 'course_b': names[b], 'students': int(count)}
+                  for a, b, count in zip(cached.course_a[selected].tolist(), cached.course_b[selected].tolist(),
+                                         cached.pair_counts[selected].tolist())],
+        'compute_ms': round(cached.compute_ms, 3),
+    }
+
+
+def group_courses_report(engine, max_age):
+    cached = results(engine, max_age)
+    arrays = cached.arrays
+    groups = [{
+        'group_id': int(group_id),
+        'group_name': arrays.group_names[i],
+        'students': int(arrays.group_sizes[i]),
+        'courses': {}
+    } for i, group_id in enumerate(arrays.group_ids)]
+    for row, col, count in zip(cached.group_rows.tolist(), cached.group_cols.tolist(), cached.group_counts.tolist()):
+        groups[row]['courses'][arrays.course_names[col]] = count
+    return {'groups': groups, 'compute_ms': round(cached.compute_ms, 3)}
+
+
+def track_writes(session_factory):
+    """
+    Drops the cached results whenever a session created by the factory commits.
+    """
+    event.listen(session_factory, 'after_commit', lambda session: invalidate())
@@ -0,0 +1,130 @@
+"""
+Response compression negotiated through Accept-Encoding. Responses of at least COMPRESSION_MIN_SIZE bytes are gzipped
+at COMPRESSION_LEVEL when the client accepts gzip; streamed responses are compressed chunk by chunk. Partial (206)
+responses are never compressed. Counters for bytes saved and CPU time spent are served at GET /admin/compression when
+COMPRESSION_ADMIN is enabled.
+"""
+import threading
+import time
+import zlib
+
+from flask import current_app, request
+
+# wbits=31 selects the gzip container instead of a raw zlib stream
+_GZIP_WBITS = 31
+# Appended to a strong ETag for the gzip representation
+ETAG_SUFFIX = '-gzip'
+
+
+class CompressionStats:
+    """
+    Thread-safe counters for compressed responses.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.compressed = 0
+            self.skipped_small = 0
+            self.skipped_not_accepted = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.cpu_seconds = 0.0
+
+    def skipped(self, reason):
+        with self._lock:
+            setattr(self, reason, getattr(self, reason) + 1)
+
+    def record(self, bytes_in, bytes_out, cpu_seconds):
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+
+    def report(self):
+        with self._lock:
+            return {
+                'compressed_responses': self.compressed,
+                'skipped_small': self.skipped_small,
+                'skipped_not_accepted': self.skipped_not_accepted,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': self.bytes_in - self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+                'cpu_seconds': round(self.cpu_seconds, 6),
+                'cpu_us_per_response': round(self.cpu_seconds / self.compressed * 1e6, 1) if self.compressed else None,
+            }
+
+
+stats = CompressionStats()
+
+
+def _gzip_stream(chunks, level):
+    """
+    Compresses a streamed body, flushing after every chunk so the client still receives data as it is produced.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    bytes_in = bytes_out = 0
+    cpu_seconds = 0.0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            started = time.thread_time()
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            cpu_seconds += time.thread_time() - started
+            bytes_in += len(chunk)
+            bytes_out += len(data)
+            yield data
+        data = compressor.flush()
+        bytes_out += len(data)
+        yield data
+        stats.record(bytes_in, bytes_out, cpu_seconds)
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """
+    after_request hook that gzips the response if the client accepts it and it is worth compressing.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or request.method == 'HEAD'):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    # Content-Range offsets refer to the uncompressed body, so partial responses are sent as they are
+    if response.status_code == 206 or 'Content-Range' in response.headers:
+        return response
+    if not request.accept_encodings['gzip']:
+        stats.skipped('skipped_not_accepted')
+        return response
+
+    level = current_app.config['COMPRESSION_LEVEL']
+    if response.is_streamed:
+        response.response = _gzip_stream(response.response, level)
+        response.direct_passthrough = False
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESSION_MIN_SIZE']:
+            stats.skipped('skipped_small')
+            return response
+        started = time.thread_time()
+        compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+        stats.record(len(data), len(compressed), time.thread_time() - started)
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = 'gzip'
+    # The compressed body is a different representation, so it gets its own strong validator
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag + ETAG_SUFFIX)
+    return response
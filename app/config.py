@@ -13,3 +13,45 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv('SECRET_KEY')
+
+    # Slow-query log, see app/profiling.py
+    SQL_PROFILING = os.getenv('SQL_PROFILING', 'false').lower() == 'true'
+    SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', 100))
+    SQL_PROFILING_SAMPLE_RATE = float(os.getenv('SQL_PROFILING_SAMPLE_RATE', 0.1))
+    SQL_SLOW_QUERY_LOG_SIZE = int(os.getenv('SQL_SLOW_QUERY_LOG_SIZE', 200))
+    SQL_EXPLAIN_INTERVAL = float(os.getenv('SQL_EXPLAIN_INTERVAL', 60))
+
+    # In-memory read model, see app/read_model.py
+    READ_MODEL = os.getenv('READ_MODEL', 'false').lower() == 'true'
+    READ_MODEL_REFRESH_SECONDS = float(os.getenv('READ_MODEL_REFRESH_SECONDS', 30))
+
+    # gzip response compression, see app/compression.py
+    COMPRESSION = os.getenv('COMPRESSION', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 500))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    COMPRESSION_ADMIN = os.getenv('COMPRESSION_ADMIN', 'false').lower() == 'true'
+
+    # Embedded SQLite mode, see app/embedded.py
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', 8))
+
+    # Roster response cache, see app/response_cache.py
+    RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'false').lower() == 'true'
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_SECONDS = float(os.getenv('RESPONSE_CACHE_SECONDS', 60))
+
+    # Admission control / load shedding, see app/admission.py
+    ADMISSION_CONTROL = os.getenv('ADMISSION_CONTROL', 'false').lower() == 'true'
+    ADMISSION_READ_LIMIT = int(os.getenv('ADMISSION_READ_LIMIT', 32))
+    ADMISSION_LIST_LIMIT = int(os.getenv('ADMISSION_LIST_LIMIT', 4))
+    ADMISSION_WRITE_LIMIT = int(os.getenv('ADMISSION_WRITE_LIMIT', 8))
+    ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', 16))
+    ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', 250))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 1))
+
+    # Enrollment analytics, see app/analytics.py
+    ANALYTICS_CACHE_SECONDS = float(os.getenv('ANALYTICS_CACHE_SECONDS', 60))
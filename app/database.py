@@ -1,9 +1,41 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from . import embedded
 from .config import Config
+from .profiling import enable_slow_query_log
 
-engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, echo=False)
+if embedded.is_sqlite(Config.SQLALCHEMY_DATABASE_URI):
+    engine = create_engine(
+        Config.SQLALCHEMY_DATABASE_URI,
+        echo=False,
+        **embedded.engine_options(Config.SQLALCHEMY_DATABASE_URI, Config.SQLITE_POOL_SIZE)
+    )
+    embedded.enable_pragmas(engine, embedded.pragmas(
+        journal_mode=Config.SQLITE_JOURNAL_MODE,
+        synchronous=Config.SQLITE_SYNCHRONOUS,
+        mmap_size=Config.SQLITE_MMAP_SIZE,
+        cache_size_kb=Config.SQLITE_CACHE_SIZE_KB,
+        busy_timeout_ms=Config.SQLITE_BUSY_TIMEOUT_MS,
+    ))
+else:
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, echo=False)
+
+if Config.SQL_PROFILING:
+    enable_slow_query_log(
+        engine,
+        threshold_ms=Config.SQL_SLOW_QUERY_MS,
+        sample_rate=Config.SQL_PROFILING_SAMPLE_RATE,
+        maxlen=Config.SQL_SLOW_QUERY_LOG_SIZE,
+        explain_interval=Config.SQL_EXPLAIN_INTERVAL,
+    )
+
+def dispose_engine_after_fork():
+    """
+    Drops the pooled connections inherited from the parent process without closing them, so a forked worker opens its
+    own connections instead of sharing sockets with the master or its siblings.
+    """
+    engine.dispose(close=False)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,70 @@
+"""
+Embedded SQLite mode, used when SQLALCHEMY_DATABASE_URI points at SQLite (single-node and edge deployments).
+
+Every connection gets WAL journaling, synchronous=NORMAL, a memory-mapped I/O window, a larger page cache and a busy
+timeout, so readers no longer block the writer and concurrent writers wait for the lock instead of failing with
+"database is locked". File databases use a QueuePool shared across threads; in-memory databases use a StaticPool, a
+single connection shared by all threads, because every new connection to ":memory:" would open an empty database.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_memory_database(uri):
+    url = make_url(uri)
+    database = url.database or ''
+    return database in ('', ':memory:') or database.startswith('file::memory:') or url.query.get('mode') == 'memory'
+
+
+def engine_options(uri, pool_size):
+    """
+    Keyword arguments for create_engine for a SQLite URI.
+    """
+    if is_memory_database(uri):
+        return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    return {
+        'poolclass': QueuePool,
+        'pool_size': pool_size,
+        'connect_args': {'check_same_thread': False},
+    }
+
+
+def pragmas(journal_mode, synchronous, mmap_size, cache_size_kb, busy_timeout_ms):
+    """
+    PRAGMA statements run on every new connection, in order.
+    """
+    return [
+        'PRAGMA foreign_keys=ON',
+        f'PRAGMA busy_timeout={int(busy_timeout_ms)}',
+        f'PRAGMA journal_mode={journal_mode}',
+        f'PRAGMA synchronous={synchronous}',
+        f'PRAGMA mmap_size={int(mmap_size)}',
+        # A negative cache_size is a size in KiB rather than a number of pages
+        f'PRAGMA cache_size={-int(cache_size_kb)}',
+    ]
+
+
+def enable_pragmas(engine, statements):
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        """
+        Runs the PRAGMAs outside a transaction; journal_mode cannot be changed inside one.
+        SQLite ignores ON DELETE clauses unless foreign keys are switched on per connection.
+        """
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def settings(connection):
+    """
+    Returns the effective PRAGMA values of a connection.
+    """
+    names = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout', 'foreign_keys')
+    return {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
@@ -5,28 +5,30 @@ from .database import Base
 student_courses = Table(
     'student_courses',
     Base.metadata,
-    Column('student_id', Integer, ForeignKey('students.id'), primary_key=True),
-    Column('course_id', Integer, ForeignKey('courses.id'), primary_key=True)
+    Column('student_id', Integer, ForeignKey('students.id', ondelete='CASCADE'), primary_key=True),
+    Column('course_id', Integer, ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True)
 )
 
 class Group(Base):
     __tablename__ = 'groups'
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
-    students = relationship("Student", back_populates="group")
+    students = relationship("Student", back_populates="group", passive_deletes=True)
 
 class Student(Base):
     __tablename__ = 'students'
     id = Column(Integer, primary_key=True)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    group_id = Column(Integer, ForeignKey('groups.id'))
+    group_id = Column(Integer, ForeignKey('groups.id', ondelete='SET NULL'))
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     group = relationship("Group", back_populates="students")
-    courses = relationship("Course", secondary=student_courses, back_populates="students")
+    courses = relationship("Course", secondary=student_courses, back_populates="students", passive_deletes=True)
 
 class Course(Base):
     __tablename__ = 'courses'
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     description = Column(Text)
-    students = relationship("Student", secondary=student_courses, back_populates="courses")
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    students = relationship("Student", secondary=student_courses, back_populates="courses", passive_deletes=True)
@@ -0,0 +1,148 @@
+"""
+Opt-in slow-query log. When SQL_PROFILING is on, every statement executed through the engine is timed; statements
+slower than SQL_SLOW_QUERY_MS are recorded with the endpoint that issued them, the shape of their bound parameters
+(types only, never values) and, for a sample of them, the database's query plan. Entries are kept in a bounded ring
+buffer that is served at GET /admin/slow_queries.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+slow_query_log = None
+
+
+class SlowQueryLog:
+    """
+    Thread-safe ring buffer of slow statements.
+    """
+
+    def __init__(self, dialect, threshold_ms, sample_rate, maxlen, explain_interval):
+        self.dialect = dialect
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain_interval = explain_interval
+        self._entries = deque(maxlen=maxlen)
+        self._last_explained = {}
+        self._lock = threading.Lock()
+
+    def should_explain(self, statement):
+        """
+        Samples EXPLAIN captures and runs at most one per distinct statement per explain_interval seconds, since
+        EXPLAIN ANALYZE executes the statement a second time.
+        """
+        if random.random() >= self.sample_rate:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_explained.get(statement)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            if len(self._last_explained) >= 10 * self._entries.maxlen:
+                self._last_explained.clear()
+            self._last_explained[statement] = now
+        return True
+
+    def record(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self):
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._last_explained.clear()
+
+
+def _parameter_shape(parameters, executemany):
+    if executemany:
+        return {'executemany': len(parameters), 'row': _parameter_shape(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if parameters:
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _current_endpoint():
+    if has_request_context():
+        return f'{request.method} {request.endpoint or request.path}'
+    return None
+
+
+def _explain(cursor, dialect, statement, parameters):
+    """
+    Captures the plan of a statement on the connection that ran it. PostgreSQL only ANALYZEs SELECTs, because
+    ANALYZE executes the statement; the EXPLAIN runs inside a savepoint so a failure cannot abort the transaction.
+    """
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if dialect == 'postgresql':
+            is_select = statement.lstrip().lower().startswith(('select', 'with'))
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if is_select else 'EXPLAIN '
+            explain_cursor.execute('SAVEPOINT slow_query_explain')
+            try:
+                explain_cursor.execute(prefix + statement, parameters)
+                plan = [row[0] for row in explain_cursor.fetchall()]
+            except Exception:
+                explain_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                raise
+            finally:
+                explain_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+            return plan
+        if dialect == 'sqlite':
+            explain_cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            return [row[-1] for row in explain_cursor.fetchall()]
+        return None
+    finally:
+        explain_cursor.close()
+
+
+def enable_slow_query_log(engine, threshold_ms, sample_rate, maxlen, explain_interval):
+    """
+    Attaches the timing listeners to the engine and returns the log they write to.
+    """
+    global slow_query_log
+    slow_query_log = SlowQueryLog(engine.dialect.name, threshold_ms, sample_rate, maxlen, explain_interval)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _record_slow_query(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_slow_query_start', None)
+        if start is None:
+            return
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms < slow_query_log.threshold_ms:
+            return
+
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'endpoint': _current_endpoint(),
+            'duration_ms': round(duration_ms, 3),
+            'statement': statement,
+            'parameters': _parameter_shape(parameters, executemany),
+            'plan': None,
+        }
+        if not executemany and slow_query_log.should_explain(statement):
+            try:
+                entry['plan'] = _explain(cursor, slow_query_log.dialect, statement, parameters)
+            except Exception as error:
+                entry['plan_error'] = str(error)
+        slow_query_log.record(entry)
+        logger.warning('Slow query (%.1f ms) from %s: %s', duration_ms, entry['endpoint'], statement)
+
+    return slow_query_log
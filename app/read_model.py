@@ -0,0 +1,455 @@
+"""
+Optional in-memory read model of the student/group/course graph (READ_MODEL=true).
+
+Students, groups and courses are stored column-wise in compact arrays: an id -> row map per entity, an int32 group_id
+column for students, interned name strings, and CSR adjacency arrays for student -> courses, course -> students and
+group -> students. The roster and single-student GET endpoints are served from it without touching the database.
+
+The write paths in app/services.py keep it current through the module-level hooks below. The model is per process:
+with several gunicorn workers a write is only applied to the worker that handled it, so every worker reloads from the
+database once its model is older than READ_MODEL_REFRESH_SECONDS. gunicorn.conf.py refuses to start several workers
+with refreshing disabled.
+"""
+import sys
+import threading
+import time
+from array import array
+
+from sqlalchemy import select
+
+from .models import Group, Student, Course, student_courses
+
+NO_GROUP = -1
+
+_EMPTY = array('i')
+
+_model = None
+_engine = None
+_refresh_seconds = 0
+# Writes applied while a new model is being built, replayed on it before it is swapped in; None when no build runs
+_pending = None
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_load_lock = threading.Lock()
+
+
+class _Adjacency:
+    """
+    CSR adjacency: the neighbours of row r are indices[offsets[r]:offsets[r + 1]]. Rows changed since the last build
+    live in an overlay of per-row arrays, which compact() folds back into the CSR arrays. Every change replaces the
+    state or a row array instead of mutating it, so readers never need the lock.
+    """
+
+    def __init__(self, n_rows, pairs):
+        self._state = self._build(n_rows, pairs)
+
+    @staticmethod
+    def _build(n_rows, pairs):
+        counts = array('i', bytes(4 * n_rows))
+        for row, _ in pairs:
+            counts[row] += 1
+        offsets = array('i', bytes(4 * (n_rows + 1)))
+        total = 0
+        for row in range(n_rows):
+            offsets[row] = total
+            total += counts[row]
+        offsets[n_rows] = total
+        indices = array('i', bytes(4 * total))
+        cursor = array('i', offsets)
+        for row, col in pairs:
+            indices[cursor[row]] = col
+            cursor[row] += 1
+        return offsets, indices, {}
+
+    def get(self, row):
+        offsets, indices, overlay = self._state
+        edited = overlay.get(row)
+        if edited is not None:
+            return edited
+        if row + 1 < len(offsets):
+            return indices[offsets[row]:offsets[row + 1]]
+        return _EMPTY
+
+    def set(self, row, cols):
+        self._state[2][row] = array('i', cols)
+
+    def add(self, row, col):
+        cols = self.get(row)
+        if col not in cols:
+            self.set(row, list(cols) + [col])
+
+    def remove(self, row, col):
+        cols = self.get(row)
+        if col in cols:
+            self.set(row, [c for c in cols if c != col])
+
+    def overlay_size(self):
+        return len(self._state[2])
+
+    def compact(self, n_rows):
+        self._state = self._build(n_rows, [(row, col) for row in range(n_rows) for col in self.get(row)])
+
+    def nbytes(self):
+        offsets, indices, overlay = self._state
+        return (sys.getsizeof(offsets) + sys.getsizeof(indices) + sys.getsizeof(overlay)
+                + sum(sys.getsizeof(cols) for cols in overlay.values()))
+
+
+def _strings_nbytes(values):
+    unique = {id(value): value for value in values}
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in unique.values())
+
+
+def _dict_nbytes(mapping):
+    return sys.getsizeof(mapping) + sum(sys.getsizeof(key) for key in mapping)
+
+
+def _intern(value):
+    return sys.intern(value) if value is not None else None
+
+
+class ReadModel:
+    """
+    Column-oriented snapshot of students, groups, courses and enrollments.
+    """
+
+    def __init__(self, groups, courses, students, enrollments):
+        self.loaded_at = time.time()
+
+        self.group_rows = {}
+        self.group_ids = array('i')
+        self.group_names = []
+        for group_id, name in groups:
+            self._append_group(group_id, name)
+
+        self.course_rows = {}
+        self.course_rows_by_name = {}
+        self.course_ids = array('i')
+        self.course_names = []
+        for course_id, name in courses:
+            self._append_course(course_id, name)
+
+        self.student_rows = {}
+        self.student_ids = array('i')
+        self.student_group_ids = array('i')
+        self.student_versions = array('i')
+        self.first_names = []
+        self.last_names = []
+        for student_id, first_name, last_name, group_id, version in students:
+            self._append_student(student_id, first_name, last_name, group_id, version)
+
+        pairs = [(self.student_rows[student_id], self.course_rows[course_id])
+                 for student_id, course_id in enrollments
+                 if student_id in self.student_rows and course_id in self.course_rows]
+        self.student_courses = _Adjacency(len(self.student_ids), pairs)
+        self.course_students = _Adjacency(len(self.course_ids), [(c, s) for s, c in pairs])
+        self.group_students = _Adjacency(len(self.group_ids), [
+            (self.group_rows[group_id], row) for row, group_id in enumerate(self.student_group_ids)
+            if group_id in self.group_rows
+        ])
+
+    @classmethod
+    def load(cls, engine):
+        with engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                # One snapshot for all four queries
+                connection.execution_options(isolation_level='REPEATABLE READ')
+            groups = connection.execute(select(Group.id, Group.name)).all()
+            courses = connection.execute(select(Course.id, Course.name)).all()
+            students = connection.execute(
+                select(Student.id, Student.first_name, Student.last_name, Student.group_id, Student.version)
+                .order_by(Student.id)
+            ).all()
+            enrollments = connection.execute(
+                select(student_courses.c.student_id, student_courses.c.course_id)
+            ).all()
+        return cls(groups, courses, students, enrollments)
+
+    # Readers run without the lock, so a new row is appended to every other column before it becomes reachable:
+    # through the id column that groups_with_max_students() iterates, and last through the id -> row maps.
+
+    def _append_group(self, group_id, name):
+        row = len(self.group_ids)
+        self.group_names.append(_intern(name))
+        self.group_ids.append(group_id)
+        self.group_rows[group_id] = row
+
+    def _append_course(self, course_id, name):
+        row = len(self.course_ids)
+        self.course_names.append(_intern(name))
+        self.course_ids.append(course_id)
+        self.course_rows[course_id] = row
+        self.course_rows_by_name[self.course_names[row]] = row
+
+    def _append_student(self, student_id, first_name, last_name, group_id, version):
+        row = len(self.student_ids)
+        self.student_group_ids.append(NO_GROUP if group_id is None else group_id)
+        self.student_versions.append(version)
+        self.first_names.append(_intern(first_name))
+        self.last_names.append(_intern(last_name))
+        self.student_ids.append(student_id)
+        self.student_rows[student_id] = row
+
+    # Reads
+
+    def _student_dict(self, row):
+        group_id = self.student_group_ids[row]
+        return {
+            'id': self.student_ids[row],
+            'first_name': self.first_names[row],
+            'last_name': self.last_names[row],
+            'group_id': group_id if group_id != NO_GROUP else None,
+            'courses': [self.course_names[c] for c in self.student_courses.get(row)]
+        }
+
+    def student(self, student_id):
+        row = self.student_rows.get(student_id)
+        return self._student_dict(row) if row is not None else None
+
+    def student_version(self, student_id):
+        row = self.student_rows.get(student_id)
+        return self.student_versions[row] if row is not None else None
+
+    def course_id(self, name):
+        row = self.course_rows_by_name.get(name)
+        return self.course_ids[row] if row is not None else None
+
+    def group_roster(self, group_id):
+        group_row = self.group_rows.get(group_id)
+        if group_row is None:
+            return None
+        return {
+            'group_id': group_id,
+            'group_name': self.group_names[group_row],
+            'students': [self._student_dict(row) for row in self.group_students.get(group_row)]
+        }
+
+    def students_by_course_name(self, course_name):
+        course_row = self.course_rows_by_name.get(course_name)
+        if course_row is None:
+            return None
+        return [self._student_dict(row) for row in self.course_students.get(course_row)]
+
+    def groups_with_max_students(self, max_count):
+        result = []
+        for group_row, group_id in enumerate(self.group_ids):
+            count = len(self.group_students.get(group_row))
+            if count <= max_count:
+                result.append({'id': group_id, 'name': self.group_names[group_row], 'student_count': count})
+        return result
+
+    # Writes, called with _lock held
+
+    def group_saved(self, group_id, name):
+        group_row = self.group_rows.get(group_id)
+        if group_row is None:
+            self._append_group(group_id, name)
+        else:
+            self.group_names[group_row] = _intern(name)
+
+    def course_saved(self, course_id, name):
+        course_row = self.course_rows.get(course_id)
+        if course_row is None:
+            self._append_course(course_id, name)
+            return
+        old_name = self.course_names[course_row]
+        if self.course_rows_by_name.get(old_name) == course_row:
+            del self.course_rows_by_name[old_name]
+        self.course_names[course_row] = _intern(name)
+        self.course_rows_by_name[self.course_names[course_row]] = course_row
+
+    def course_deleted(self, course_id):
+        course_row = self.course_rows.pop(course_id, None)
+        if course_row is None:
+            return
+        name = self.course_names[course_row]
+        if self.course_rows_by_name.get(name) == course_row:
+            del self.course_rows_by_name[name]
+        for row in self.course_students.get(course_row):
+            self.student_courses.remove(row, course_row)
+        self.course_students.set(course_row, ())
+
+    def student_saved(self, student_id, first_name, last_name, group_id, version):
+        row = self.student_rows.get(student_id)
+        if row is None:
+            self._append_student(student_id, first_name, last_name, None, version)
+            row = self.student_rows[student_id]
+        else:
+            self.first_names[row] = _intern(first_name)
+            self.last_names[row] = _intern(last_name)
+            self.student_versions[row] = version
+        self._move(row, group_id)
+
+    def _move(self, row, group_id):
+        group_id = NO_GROUP if group_id is None else group_id
+        old_group_id = self.student_group_ids[row]
+        if old_group_id == group_id:
+            return
+        if old_group_id in self.group_rows:
+            self.group_students.remove(self.group_rows[old_group_id], row)
+        if group_id in self.group_rows:
+            self.group_students.add(self.group_rows[group_id], row)
+        self.student_group_ids[row] = group_id
+
+    def students_moved(self, moved, group_id):
+        """
+        Takes (student_id, new version) pairs. The versions are set rather than bumped, so a move that the database
+        snapshot already contains can be replayed on it.
+        """
+        for student_id, version in moved:
+            row = self.student_rows.get(student_id)
+            if row is not None:
+                self._move(row, group_id)
+                self.student_versions[row] = version
+
+    def students_deleted(self, student_ids):
+        for student_id in student_ids:
+            row = self.student_rows.pop(student_id, None)
+            if row is None:
+                continue
+            self._move(row, None)
+            for course_row in self.student_courses.get(row):
+                self.course_students.remove(course_row, row)
+            self.student_courses.set(row, ())
+
+    def enrollment_added(self, student_id, course_id):
+        row = self.student_rows.get(student_id)
+        course_row = self.course_rows.get(course_id)
+        if row is not None and course_row is not None:
+            self.student_courses.add(row, course_row)
+            self.course_students.add(course_row, row)
+
+    def enrollment_removed(self, student_id, course_id):
+        row = self.student_rows.get(student_id)
+        course_row = self.course_rows.get(course_id)
+        if row is not None and course_row is not None:
+            self.student_courses.remove(row, course_row)
+            self.course_students.remove(course_row, row)
+
+    def compact(self):
+        """
+        Folds the adjacency overlays back into CSR arrays once they hold more than an eighth of the rows.
+        """
+        for adjacency, n_rows in ((self.student_courses, len(self.student_ids)),
+                                  (self.course_students, len(self.course_ids)),
+                                  (self.group_students, len(self.group_ids))):
+            if adjacency.overlay_size() > max(64, n_rows // 8):
+                adjacency.compact(n_rows)
+
+    # Reporting
+
+    def memory_report(self):
+        columns = {
+            'student_rows': _dict_nbytes(self.student_rows),
+            'student_ids': sys.getsizeof(self.student_ids),
+            'student_group_ids': sys.getsizeof(self.student_group_ids),
+            'student_versions': sys.getsizeof(self.student_versions),
+            'first_names': _strings_nbytes(self.first_names),
+            'last_names': _strings_nbytes(self.last_names),
+            'group_rows': _dict_nbytes(self.group_rows),
+            'group_ids': sys.getsizeof(self.group_ids),
+            'group_names': _strings_nbytes(self.group_names),
+            'course_rows': _dict_nbytes(self.course_rows) + _dict_nbytes(self.course_rows_by_name),
+            'course_ids': sys.getsizeof(self.course_ids),
+            'course_names': _strings_nbytes(self.course_names),
+            'student_courses': self.student_courses.nbytes(),
+            'course_students': self.course_students.nbytes(),
+            'group_students': self.group_students.nbytes(),
+        }
+        return {
+            'loaded_at': self.loaded_at,
+            'students': len(self.student_rows),
+            'groups': len(self.group_rows),
+            'courses': len(self.course_rows),
+            'enrollments': sum(len(self.student_courses.get(row)) for row in self.student_rows.values()),
+            'overlay_rows': {
+                'student_courses': self.student_courses.overlay_size(),
+                'course_students': self.course_students.overlay_size(),
+                'group_students': self.group_students.overlay_size(),
+            },
+            'bytes': columns,
+            'total_bytes': sum(columns.values()),
+        }
+
+
+def load(engine, refresh_seconds=0):
+    """
+    Builds the read model from the database and starts serving from it. The build runs without the write lock, so
+    writes go on meanwhile: they are applied to the current model and logged, and the log is replayed on the new model
+    before it is swapped in. A replayed write may already be in the snapshot, so every write hook is idempotent.
+    """
+    global _model, _engine, _refresh_seconds, _pending
+    _engine, _refresh_seconds = engine, refresh_seconds
+    with _load_lock:
+        with _lock:
+            _pending = []
+        try:
+            model = ReadModel.load(engine)
+            with _lock:
+                for method, args in _pending:
+                    getattr(model, method)(*args)
+                model.compact()
+                _model = model
+        finally:
+            with _lock:
+                _pending = None
+
+
+def _refresh():
+    try:
+        load(_engine, _refresh_seconds)
+    finally:
+        _refresh_lock.release()
+
+
+def current():
+    """
+    Returns the active read model, or None when it is disabled. Starts a background reload once the model is older
+    than READ_MODEL_REFRESH_SECONDS.
+    """
+    model = _model
+    if model is not None and _refresh_seconds and time.time() - model.loaded_at > _refresh_seconds \
+            and _refresh_lock.acquire(blocking=False):
+        threading.Thread(target=_refresh, daemon=True).start()
+    return model
+
+
+def _apply(method, *args):
+    with _lock:
+        if _pending is not None:
+            _pending.append((method, args))
+        if _model is not None:
+            getattr(_model, method)(*args)
+            _model.compact()
+
+
+def group_saved(group_id, name):
+    _apply('group_saved', group_id, name)
+
+
+def course_saved(course_id, name):
+    _apply('course_saved', course_id, name)
+
+
+def course_deleted(course_id):
+    _apply('course_deleted', course_id)
+
+
+def student_saved(student_id, first_name, last_name, group_id, version):
+    _apply('student_saved', student_id, first_name, last_name, group_id, version)
+
+
+def students_moved(moved, group_id):
+    _apply('students_moved', moved, group_id)
+
+
+def students_deleted(student_ids):
+    _apply('students_deleted', student_ids)
+
+
+def enrollment_added(student_id, course_id):
+    _apply('enrollment_added', student_id, course_id)
+
+
+def enrollment_removed(student_id, course_id):
+    _apply('enrollment_removed', student_id, course_id)
@@ -0,0 +1,206 @@
+"""
+Optional cache of serialized roster responses (RESPONSE_CACHE=true).
+
+GET /groups/<id>/students and GET /students_by_course/<name> are cached as the JSON bytes that were sent, keyed by
+path and query string. Every entry records the groups, courses and students it was built from; the write paths in
+app/services.py call invalidate() with the rows they changed, which evicts exactly the entries that depend on them.
+The cache is a least-recently-used map bounded by RESPONSE_CACHE_MAX_BYTES. Entries also expire after
+RESPONSE_CACHE_SECONDS, because the cache is per process and writes handled by other workers are not seen otherwise.
+Counters are served at GET /admin/response_cache.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+from flask_restful.representations.json import output_json
+
+# Bookkeeping per entry (OrderedDict node, _Entry object, tag index slots), on top of the key, body and tags
+_ENTRY_OVERHEAD = 200
+# Invalidations remembered per tag to reject results built before them; beyond this the whole history is collapsed
+_INVALIDATION_HISTORY = 100000
+
+
+def tags(groups=(), courses=(), students=()):
+    return (
+        [f'group:{group_id}' for group_id in groups]
+        + [f'course:{course_id}' for course_id in courses]
+        + [f'student:{student_id}' for student_id in students]
+    )
+
+
+class _Entry:
+    __slots__ = ('body', 'tags', 'nbytes', 'stored_at')
+
+    def __init__(self, key, body, entry_tags):
+        self.body = body
+        self.tags = entry_tags
+        self.nbytes = (sys.getsizeof(key) + sys.getsizeof(body) + sum(sys.getsizeof(tag) for tag in entry_tags)
+                       + _ENTRY_OVERHEAD)
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of response bodies with a tag -> keys index for invalidation. Thread-safe.
+    """
+
+    def __init__(self, max_bytes, max_age):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._generation = 0
+        self._invalidated_at = {}
+        self._history_floor = 0
+        self.nbytes = 0
+        self.hits = self.misses = self.stores = 0
+        self.evicted_lru = self.evicted_expired = self.evicted_invalidated = self.rejected_stale = 0
+
+    @property
+    def generation(self):
+        """
+        Token to take before building a response and pass to put(), so results that raced a write are not stored.
+        """
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_age and time.monotonic() - entry.stored_at >= self.max_age:
+                self._remove(key)
+                self.evicted_expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+
+    def put(self, key, body, entry_tags, generation):
+        with self._lock:
+            if generation < self._history_floor or any(
+                    self._invalidated_at.get(tag, 0) > generation for tag in entry_tags):
+                self.rejected_stale += 1
+                return False
+            entry = _Entry(key, body, tuple(entry_tags))
+            if entry.nbytes > self.max_bytes:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            for tag in entry.tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            self.stores += 1
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evicted_lru += 1
+            return True
+
+    def invalidate(self, entry_tags):
+        """
+        Evicts every entry that depends on one of the tags.
+        """
+        with self._lock:
+            self._generation += 1
+            for tag in entry_tags:
+                self._invalidated_at[tag] = self._generation
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.evicted_invalidated += 1
+            if len(self._invalidated_at) > _INVALIDATION_HISTORY:
+                self._invalidated_at.clear()
+                self._history_floor = self._generation
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._history_floor = self._generation
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self.nbytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+        for tag in entry.tags:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+    def report(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'body_bytes': sum(len(entry.body) for entry in self._entries.values()),
+                'max_bytes': self.max_bytes,
+                'max_age': self.max_age,
+                'tags': len(self._keys_by_tag),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'stores': self.stores,
+                'evicted_lru': self.evicted_lru,
+                'evicted_expired': self.evicted_expired,
+                'evicted_invalidated': self.evicted_invalidated,
+                'rejected_stale': self.rejected_stale,
+            }
+
+
+_cache = None
+
+
+def enable(max_bytes, max_age):
+    global _cache
+    _cache = ResponseCache(max_bytes, max_age)
+
+
+def current():
+    """
+    Returns the active cache, or None when it is disabled.
+    """
+    return _cache
+
+
+def _json_response(body):
+    response = current_app.response_class(body, status=200)
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
+
+def serve(build):
+    """
+    Serves the current GET request from the cache. On a miss, build() returns (data, status, tags); 200 responses
+    are serialized the same way Flask-RESTful would and stored under their tags.
+    """
+    cache = _cache
+    if cache is None:
+        data, status, _ = build()
+        return data, status
+
+    key = request.full_path
+    body = cache.get(key)
+    if body is not None:
+        return _json_response(body)
+
+    generation = cache.generation
+    data, status, entry_tags = build()
+    if status != 200:
+        return data, status
+    body = output_json(data, status).get_data()
+    cache.put(key, body, entry_tags, generation)
+    return _json_response(body)
+
+
+def invalidate(groups=(), courses=(), students=()):
+    cache = _cache
+    if cache is not None:
+        cache.invalidate(tags(groups, courses, students))
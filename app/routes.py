@@ -1,19 +1,58 @@
-from flask_restful import Resource, Api, reqparse
+from flask import request
+from flask_restful import Resource, Api
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 
-from .database import SessionLocal
+from . import admission, analytics, compression, profiling, read_model, response_cache
+from .config import Config
+from .database import SessionLocal, engine
 from .models import Group, Student, Course
+from .schemas import Argument, RequestSchema
 from .services import (
     get_groups_with_student_count,
     get_students_by_course_name,
     add_new_student,
     delete_student_by_id,
+    delete_students,
+    reassign_students,
+    update_student,
+    update_course,
+    delete_course,
     add_student_to_course,
     remove_student_from_course
 )
 
 
+def _int_list(value):
+    """
+    Parses a comma-separated list of integers, e.g. "1,2,3".
+    """
+    return [int(item) for item in str(value).split(',') if item.strip()]
+
+
+def _if_match_versions():
+    """
+    Returns the row versions listed in the If-Match header, or None when the header is absent or "*".
+    If-Match uses strong comparison, so weak tags never match. The gzip representation's tag (see app/compression.py)
+    names the same version.
+    """
+    if 'If-Match' not in request.headers or request.if_match.star_tag:
+        return None
+    tags = (tag.removesuffix(compression.ETAG_SUFFIX) for tag in request.if_match.as_set())
+    return [int(tag) for tag in tags if tag.isdigit()]
+
+
+def _etag(version):
+    return {'ETag': f'"{version}"'}
+
+
+def _is_foreign_key_violation(error):
+    """
+    True if the IntegrityError was raised by a foreign key (PostgreSQL SQLSTATE 23503, or SQLite's message).
+    """
+    return getattr(error.orig, 'pgcode', None) == '23503' or 'FOREIGN KEY constraint failed' in str(error.orig)
+
+
 def initialize_routes(api: Api):
     """
     Registers all the resource routes with the Flask-RESTful API.
@@ -27,6 +66,18 @@ def initialize_routes(api: Api):
     api.add_resource(GroupStudentsResource, '/groups/<int:group_id>/students')
     api.add_resource(GroupWithMaxStudentsResource, '/groups/with_max_students')
     api.add_resource(StudentsByCourseResource, '/students_by_course/<string:course_name>')  # Newly Added
+    api.add_resource(CoEnrollmentResource, '/analytics/co_enrollment')
+    api.add_resource(GroupCoursesResource, '/analytics/group_courses')
+    if Config.SQL_PROFILING:
+        api.add_resource(SlowQueryLogResource, '/admin/slow_queries')
+    if Config.READ_MODEL:
+        api.add_resource(ReadModelResource, '/admin/read_model')
+    if Config.COMPRESSION and Config.COMPRESSION_ADMIN:
+        api.add_resource(CompressionStatsResource, '/admin/compression')
+    if Config.RESPONSE_CACHE:
+        api.add_resource(ResponseCacheResource, '/admin/response_cache')
+    if Config.ADMISSION_CONTROL:
+        api.add_resource(AdmissionResource, '/admin/admission')
 
 
 class GroupListResource(Resource):
@@ -34,6 +85,12 @@ class GroupListResource(Resource):
     Resource for handling operations on the collection of groups.
     """
 
+    admission_class = admission.LIST
+
+    post_schema = RequestSchema(
+        Argument('name', type=str, required=True, help='Group name is required'),
+    )
+
     def get(self):
         session = SessionLocal()
         try:
@@ -43,15 +100,14 @@ class GroupListResource(Resource):
             session.close()
 
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('name', type=str, required=True, help='Group name is required')
-        args = parser.parse_args()
+        args = self.post_schema.parse()
 
         session = SessionLocal()
         try:
             group = Group(name=args['name'])
             session.add(group)
             session.commit()
+            read_model.group_saved(group.id, group.name)
             return {'id': group.id, 'name': group.name}, 201
         except IntegrityError:
             session.rollback()
@@ -65,11 +121,24 @@ class StudentListResource(Resource):
     Resource for handling operations on the collection of students.
     """
 
+    admission_class = admission.LIST
+
+    get_schema = RequestSchema(
+        Argument('course', type=str, location='args', help='Filter by course name'),
+        Argument('max_group_size', type=int, location='args', help='Filter groups with max student count'),
+    )
+    post_schema = RequestSchema(
+        Argument('first_name', type=str, required=True, help='First name is required'),
+        Argument('last_name', type=str, required=True, help='Last name is required'),
+        Argument('group_id', type=int, required=False, help='Group ID must be an integer'),
+    )
+    delete_schema = RequestSchema(
+        Argument('group_id', type=int, location='args', help='Group ID must be an integer'),
+        Argument('ids', type=_int_list, location='args', help='ids must be a comma-separated list of integers'),
+    )
+
     def get(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('course', type=str, location='args', help='Filter by course name')
-        parser.add_argument('max_group_size', type=int, location='args', help='Filter groups with max student count')
-        args = parser.parse_args()
+        args = self.get_schema.parse()
 
         session = SessionLocal()
         try:
@@ -79,9 +148,8 @@ class StudentListResource(Resource):
             elif args['max_group_size'] is not None:
                 # Get groups with student count <= max_group_size
                 groups = get_groups_with_student_count(session, args['max_group_size'])
-                students = []
-                for group in groups:
-                    students.extend(group.students)
+                students = session.query(Student).options(joinedload(Student.courses)) \
+                    .filter(Student.group_id.in_([g.id for g in groups])).order_by(Student.id).all()
             else:
                 # Get all students
                 students = session.query(Student).options(joinedload(Student.courses)).all()
@@ -100,11 +168,7 @@ class StudentListResource(Resource):
             session.close()
 
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('first_name', type=str, required=True, help='First name is required')
-        parser.add_argument('last_name', type=str, required=True, help='Last name is required')
-        parser.add_argument('group_id', type=int, required=False, help='Group ID must be an integer')
-        args = parser.parse_args()
+        args = self.post_schema.parse()
 
         session = SessionLocal()
         try:
@@ -126,13 +190,38 @@ class StudentListResource(Resource):
         finally:
             session.close()
 
+    def delete(self):
+        args = self.delete_schema.parse()
+        if args['group_id'] is None and args['ids'] is None:
+            return {'message': 'group_id or ids is required'}, 400
+
+        session = SessionLocal()
+        try:
+            deleted_ids = delete_students(session, group_id=args['group_id'], student_ids=args['ids'])
+            return {'message': 'Students deleted successfully', 'deleted': len(deleted_ids)}, 200
+        finally:
+            session.close()
+
 
 class StudentResource(Resource):
     """
     Resource for handling operations on individual students.
     """
 
+    put_schema = RequestSchema(
+        Argument('first_name', type=str, required=False),
+        Argument('last_name', type=str, required=False),
+        Argument('group_id', type=int, required=False, store_missing=False),
+    )
+
     def get(self, student_id):
+        model = read_model.current()
+        if model is not None:
+            student = model.student(student_id)
+            if student is None:
+                return {'message': 'Student not found'}, 404
+            return student, 200, _etag(model.student_version(student_id))
+
         session = SessionLocal()
         try:
             student = session.query(Student).options(joinedload(Student.courses)).filter(
@@ -145,38 +234,33 @@ class StudentResource(Resource):
                 'last_name': student.last_name,
                 'group_id': student.group_id,
                 'courses': [c.name for c in student.courses]
-            }, 200
+            }, 200, _etag(student.version)
         finally:
             session.close()
 
     def put(self, student_id):
-        parser = reqparse.RequestParser()
-        parser.add_argument('first_name', type=str, required=False)
-        parser.add_argument('last_name', type=str, required=False)
-        parser.add_argument('group_id', type=int, required=False)
-        args = parser.parse_args()
+        args = self.put_schema.parse()
+        values = {}
+        if args.get('first_name'):
+            values['first_name'] = args['first_name']
+        if args.get('last_name'):
+            values['last_name'] = args['last_name']
+        if 'group_id' in args:
+            values['group_id'] = args['group_id']
+        versions = _if_match_versions()
 
         session = SessionLocal()
         try:
-            student = session.query(Student).filter(Student.id == student_id).first()
-            if not student:
+            row = update_student(session, student_id, values, versions)
+            if row is None:
+                if versions is not None and session.query(Student.id).filter(Student.id == student_id).first():
+                    return {'message': 'Student has been modified by another request'}, 412
                 return {'message': 'Student not found'}, 404
-
-            if args.get('first_name'):
-                student.first_name = args['first_name']
-            if args.get('last_name'):
-                student.last_name = args['last_name']
-            if 'group_id' in args:
-                if args['group_id'] is not None:
-                    group = session.query(Group).filter(Group.id == args['group_id']).first()
-                    if not group:
-                        return {'message': 'Group not found'}, 404
-                student.group_id = args['group_id']
-
-            session.commit()
-            return {'message': 'Student updated successfully'}, 200
-        except IntegrityError:
+            return {'message': 'Student updated successfully'}, 200, _etag(row.version)
+        except IntegrityError as error:
             session.rollback()
+            if _is_foreign_key_violation(error):
+                return {'message': 'Group not found'}, 404
             return {'message': 'Error updating student'}, 400
         finally:
             session.close()
@@ -198,6 +282,13 @@ class CourseListResource(Resource):
     Resource for handling operations on the collection of courses.
     """
 
+    admission_class = admission.LIST
+
+    post_schema = RequestSchema(
+        Argument('name', type=str, required=True, help='Course name is required'),
+        Argument('description', type=str, required=False),
+    )
+
     def get(self):
         session = SessionLocal()
         try:
@@ -207,16 +298,14 @@ class CourseListResource(Resource):
             session.close()
 
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('name', type=str, required=True, help='Course name is required')
-        parser.add_argument('description', type=str, required=False)
-        args = parser.parse_args()
+        args = self.post_schema.parse()
 
         session = SessionLocal()
         try:
             course = Course(name=args['name'], description=args.get('description'))
             session.add(course)
             session.commit()
+            read_model.course_saved(course.id, course.name)
             return {'id': course.id, 'name': course.name, 'description': course.description}, 201
         except IntegrityError:
             session.rollback()
@@ -230,35 +319,42 @@ class CourseResource(Resource):
     Resource for handling operations on individual courses.
     """
 
+    put_schema = RequestSchema(
+        Argument('name', type=str, required=False),
+        Argument('description', type=str, required=False),
+    )
+
     def get(self, course_id):
         session = SessionLocal()
         try:
             course = session.query(Course).filter(Course.id == course_id).first()
             if not course:
                 return {'message': 'Course not found'}, 404
-            return {'id': course.id, 'name': course.name, 'description': course.description}, 200
+            return {'id': course.id, 'name': course.name, 'description': course.description}, 200, \
+                _etag(course.version)
         finally:
             session.close()
 
+    def _modified_or_missing(self, session, course_id, versions):
+        if versions is not None and session.query(Course.id).filter(Course.id == course_id).first():
+            return {'message': 'Course has been modified by another request'}, 412
+        return {'message': 'Course not found'}, 404
+
     def put(self, course_id):
-        parser = reqparse.RequestParser()
-        parser.add_argument('name', type=str, required=False)
-        parser.add_argument('description', type=str, required=False)
-        args = parser.parse_args()
+        args = self.put_schema.parse()
+        values = {}
+        if args.get('name'):
+            values['name'] = args['name']
+        if args.get('description'):
+            values['description'] = args['description']
+        versions = _if_match_versions()
 
         session = SessionLocal()
         try:
-            course = session.query(Course).filter(Course.id == course_id).first()
-            if not course:
-                return {'message': 'Course not found'}, 404
-
-            if args.get('name'):
-                course.name = args['name']
-            if args.get('description'):
-                course.description = args['description']
-
-            session.commit()
-            return {'message': 'Course updated successfully'}, 200
+            row = update_course(session, course_id, values, versions)
+            if row is None:
+                return self._modified_or_missing(session, course_id, versions)
+            return {'message': 'Course updated successfully'}, 200, _etag(row.version)
         except IntegrityError:
             session.rollback()
             return {'message': 'Error updating course'}, 400
@@ -266,13 +362,11 @@ class CourseResource(Resource):
             session.close()
 
     def delete(self, course_id):
+        versions = _if_match_versions()
         session = SessionLocal()
         try:
-            course = session.query(Course).filter(Course.id == course_id).first()
-            if not course:
-                return {'message': 'Course not found'}, 404
-            session.delete(course)
-            session.commit()
+            if not delete_course(session, course_id, versions):
+                return self._modified_or_missing(session, course_id, versions)
             return {'message': 'Course deleted successfully'}, 200
         finally:
             session.close()
@@ -308,15 +402,40 @@ class StudentCourseResource(Resource):
 
 class GroupStudentsResource(Resource):
     """
-    Resource for retrieving all students within a specific group.
+    Resource for retrieving and reassigning the students within a specific group.
     """
 
+    admission_class = admission.LIST
+
+    put_schema = RequestSchema(
+        Argument('group_id', type=int, required=True, nullable=False, help='Target group_id is required'),
+        Argument('student_ids', type=int, action='append', store_missing=False,
+                 help='student_ids must be a list of integers'),
+    )
+
     def get(self, group_id):
+        return response_cache.serve(lambda: self._roster(group_id))
+
+    def _roster(self, group_id):
+        """
+        Returns (data, status, cache tags) for the group's roster.
+        """
+        model = read_model.current()
+        if model is not None:
+            roster = model.group_roster(group_id)
+            if roster is None:
+                return {'message': 'Group not found'}, 404, None
+            return roster, 200, response_cache.tags(
+                groups=[group_id],
+                courses={model.course_id(name) for s in roster['students'] for name in s['courses']},
+                students=[s['id'] for s in roster['students']]
+            )
+
         session = SessionLocal()
         try:
             group = session.query(Group).options(joinedload(Group.students)).filter(Group.id == group_id).first()
             if not group:
-                return {'message': 'Group not found'}, 404
+                return {'message': 'Group not found'}, 404, None
             students = [{
                 'id': s.id,
                 'first_name': s.first_name,
@@ -324,7 +443,31 @@ class GroupStudentsResource(Resource):
                 'group_id': s.group_id,
                 'courses': [c.name for c in s.courses]
             } for s in group.students]
-            return {'group_id': group.id, 'group_name': group.name, 'students': students}, 200
+            return {'group_id': group.id, 'group_name': group.name, 'students': students}, 200, response_cache.tags(
+                groups=[group.id],
+                courses={c.id for s in group.students for c in s.courses},
+                students=[s.id for s in group.students]
+            )
+        finally:
+            session.close()
+
+    def put(self, group_id):
+        args = self.put_schema.parse()
+
+        session = SessionLocal()
+        try:
+            # Without student_ids the whole group moves; an empty list selects no one
+            student_ids = args['student_ids'] if 'student_ids' in args else None
+            moved_ids = reassign_students(session, group_id, args['group_id'], student_ids)
+            if not moved_ids:
+                # No row was updated, so the foreign key never checked the target group
+                existing = session.query(Group.id).filter(Group.id.in_([group_id, args['group_id']])).count()
+                if existing < len({group_id, args['group_id']}):
+                    return {'message': 'Group not found'}, 404
+            return {'message': 'Students reassigned successfully', 'updated': len(moved_ids)}, 200
+        except IntegrityError:
+            session.rollback()
+            return {'message': 'Group not found'}, 404
         finally:
             session.close()
 
@@ -334,14 +477,22 @@ class GroupWithMaxStudentsResource(Resource):
     Resource for retrieving groups with a student count less than or equal to a specified maximum.
     """
 
+    admission_class = admission.LIST
+
+    get_schema = RequestSchema(
+        Argument('max_count', type=int, required=True, help='max_count is required and must be an integer',
+                 location='args'),
+    )
+
     def get(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('max_count', type=int, required=True, help='max_count is required and must be an integer',
-                            location='args')
-        args = parser.parse_args()
+        args = self.get_schema.parse()
         if args['max_count'] < 0:
             return {'message': 'max_count must be a non-negative integer'}, 400
 
+        model = read_model.current()
+        if model is not None:
+            return model.groups_with_max_students(args['max_count']), 200
+
         session = SessionLocal()
         try:
             groups = get_groups_with_student_count(session, args['max_count'])
@@ -350,7 +501,7 @@ class GroupWithMaxStudentsResource(Resource):
                 result.append({
                     'id': g.id,
                     'name': g.name,
-                    'student_count': len(g.students)
+                    'student_count': g.student_count
                 })
             return result, 200
         finally:
@@ -362,13 +513,30 @@ class StudentsByCourseResource(Resource):
     Resource for retrieving all students enrolled in a specific course by course name.
     """
 
+    admission_class = admission.LIST
+
     def get(self, course_name):
+        return response_cache.serve(lambda: self._roster(course_name))
+
+    def _roster(self, course_name):
+        """
+        Returns (data, status, cache tags) for the course's roster.
+        """
+        model = read_model.current()
+        if model is not None:
+            students = model.students_by_course_name(course_name)
+            if students is None:
+                return {'message': 'Course not found'}, 404, None
+            courses = {model.course_id(course_name)}
+            courses.update(model.course_id(name) for s in students for name in s['courses'])
+            return students, 200, response_cache.tags(courses=courses, students=[s['id'] for s in students])
+
         session = SessionLocal()
         try:
             # Query the course by name
             course = session.query(Course).filter(Course.name == course_name).first()
             if not course:
-                return {'message': 'Course not found'}, 404
+                return {'message': 'Course not found'}, 404, None
 
             # Retrieve all students enrolled in the course
             students = course.students  # Assuming a relationship is defined
@@ -380,6 +548,120 @@ class StudentsByCourseResource(Resource):
                 'courses': [c.name for c in student.courses]
             } for student in students]
 
-            return students_data, 200
+            return students_data, 200, response_cache.tags(
+                courses={c.id for student in students for c in student.courses} | {course.id},
+                students=[student.id for student in students]
+            )
         finally:
             session.close()
+
+
+class CoEnrollmentResource(Resource):
+    """
+    Resource for the course co-enrollment matrix: how many students take both course A and course B.
+    """
+
+    admission_class = admission.LIST
+
+    get_schema = RequestSchema(
+        Argument('min_count', type=int, location='args', default=1, help='min_count must be an integer'),
+        Argument('limit', type=int, location='args', help='limit must be an integer'),
+    )
+
+    def get(self):
+        args = self.get_schema.parse()
+        if args['min_count'] < 1 or (args['limit'] is not None and args['limit'] < 0):
+            return {'message': 'min_count must be positive and limit non-negative'}, 400
+        return analytics.co_enrollment_report(engine, Config.ANALYTICS_CACHE_SECONDS,
+                                              args['min_count'], args['limit']), 200
+
+
+class GroupCoursesResource(Resource):
+    """
+    Resource for the number of students of each group enrolled in each course.
+    """
+
+    admission_class = admission.LIST
+
+    def get(self):
+        return analytics.group_courses_report(engine, Config.ANALYTICS_CACHE_SECONDS), 200
+
+
+class SlowQueryLogResource(Resource):
+    """
+    Resource for inspecting the slow-query log. Only registered when SQL_PROFILING is enabled.
+    """
+
+    admission_class = None
+
+    def get(self):
+        log = profiling.slow_query_log
+        return {
+            'threshold_ms': log.threshold_ms,
+            'sample_rate': log.sample_rate,
+            'entries': log.entries()
+        }, 200
+
+    def delete(self):
+        profiling.slow_query_log.clear()
+        return {'message': 'Slow query log cleared'}, 200
+
+
+class ReadModelResource(Resource):
+    """
+    Resource for inspecting and reloading the in-memory read model. Only registered when READ_MODEL is enabled.
+    """
+
+    admission_class = None
+
+    def get(self):
+        return read_model.current().memory_report(), 200
+
+    def post(self):
+        read_model.load(engine, Config.READ_MODEL_REFRESH_SECONDS)
+        return {'message': 'Read model reloaded'}, 200
+
+
+class CompressionStatsResource(Resource):
+    """
+    Resource for the response compression counters. Only registered when COMPRESSION and COMPRESSION_ADMIN are enabled.
+    """
+
+    admission_class = None
+
+    def get(self):
+        return compression.stats.report(), 200
+
+    def delete(self):
+        compression.stats.reset()
+        return {'message': 'Compression stats reset'}, 200
+
+
+class ResponseCacheResource(Resource):
+    """
+    Resource for the roster response cache. Only registered when RESPONSE_CACHE is enabled.
+    """
+
+    admission_class = None
+
+    def get(self):
+        return response_cache.current().report(), 200
+
+    def delete(self):
+        response_cache.current().clear()
+        return {'message': 'Response cache cleared'}, 200
+
+
+class AdmissionResource(Resource):
+    """
+    Resource for the admission-control counters per request class. Only registered when ADMISSION_CONTROL is enabled.
+    """
+
+    admission_class = None
+
+    def get(self):
+        return admission.report(), 200
+
+    def delete(self):
+        admission.reset()
+        return {'message': 'Admission stats reset'}, 200
@@ -0,0 +1,108 @@
+"""
+Declarative request validation. Schemas are built once at import time, so handling a request only has to look values
+up and convert them, instead of building a new reqparse.RequestParser and re-adding every argument per call.
+Error responses are the same as reqparse's: 400 with {"message": {"<name>": "<help or error>"}}.
+"""
+
+from flask import request
+from flask_restful import abort
+
+_FRIENDLY_LOCATIONS = {
+    'json': 'the JSON body',
+    'form': 'the post body',
+    'args': 'the query string',
+    'values': 'the post body or the query string',
+    'headers': 'the HTTP headers',
+    'cookies': 'the request\'s cookies',
+    'files': 'an uploaded file',
+    'view_args': 'the URL path',
+}
+
+_DEFAULT_LOCATION = ('json', 'values')
+
+
+def _source(location):
+    """
+    Returns the mapping holding the request values for a location.
+    """
+    if location == 'json':
+        return request.get_json(silent=True) if request.is_json else None
+    return getattr(request, location, None)
+
+
+class Argument:
+    """
+    A single request argument. Accepts the reqparse.Argument options used by this project.
+    `type` is called with the raw value and may raise to reject it.
+    """
+
+    def __init__(self, name, type=str, required=False, help=None, location=_DEFAULT_LOCATION, action='store',
+                 default=None, nullable=True, store_missing=True):
+        self.name = name
+        self.type = type
+        self.required = required
+        self.help = help
+        self.locations = (location,) if isinstance(location, str) else tuple(location)
+        self.action = action
+        self.default = default
+        self.nullable = nullable
+        self.store_missing = store_missing
+        self.missing_message = self._error_message(
+            'Missing required parameter in {0}'.format(
+                ' or '.join(_FRIENDLY_LOCATIONS.get(loc, loc) for loc in self.locations)
+            )
+        )
+
+    def _error_message(self, error):
+        return self.help.format(error_msg=error) if self.help else error
+
+    def fail(self, error):
+        abort(400, message={self.name: self._error_message(str(error))})
+
+    def convert(self, value):
+        if value is None:
+            if self.nullable:
+                return None
+            raise ValueError('Must not be null!')
+        return self.type(value)
+
+
+class RequestSchema:
+    """
+    A compiled set of arguments. `parse()` returns a dict with one entry per argument, like reqparse's Namespace.
+    """
+
+    def __init__(self, *arguments):
+        self.arguments = arguments
+        self.locations = tuple(dict.fromkeys(loc for arg in arguments for loc in arg.locations))
+
+    def parse(self):
+        sources = {location: _source(location) for location in self.locations}
+        result = {}
+        for arg in self.arguments:
+            values = None
+            for location in arg.locations:
+                source = sources[location]
+                if source is not None and arg.name in source:
+                    if hasattr(source, 'getlist'):
+                        values = source.getlist(arg.name)
+                    else:
+                        values = source[arg.name]
+                        if not (arg.action == 'append' and isinstance(values, list)):
+                            values = [values]
+                    break
+
+            # An explicit empty JSON list is a value of its own for optional 'append' arguments, not a missing one
+            if values is None or (not values and arg.required):
+                if arg.required:
+                    abort(400, message={arg.name: arg.missing_message})
+                if arg.store_missing:
+                    result[arg.name] = arg.default() if callable(arg.default) else arg.default
+                continue
+
+            try:
+                converted = [arg.convert(value) for value in values]
+            except Exception as error:
+                arg.fail(error)
+            result[arg.name] = converted if arg.action == 'append' else converted[0]
+        return result
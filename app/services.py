@@ -1,6 +1,9 @@
-from sqlalchemy.orm import joinedload
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 
-from .models import Group, Student, Course
+from . import read_model, response_cache
+from .models import Group, Student, Course, student_courses
 
 
 
@@ -11,51 +14,153 @@ def add_new_student(session, first_name, last_name, group_id=None):
     student = Student(first_name=first_name, last_name=last_name, group_id=group_id)
     session.add(student)
     session.commit()
+    read_model.student_saved(student.id, first_name, last_name, group_id, student.version)
+    if group_id is not None:
+        response_cache.invalidate(groups=[group_id])
     return student
 
+def update_student(session, student_id, values, versions=None):
+    """
+    Updates a student with a single UPDATE ... RETURNING and bumps its version.
+    If versions is given, the row is only updated while its current version is one of them.
+    Returns the updated row, or None if no student matched. Raises IntegrityError if the group does not exist.
+    """
+    statement = update(Student).where(Student.id == student_id)
+    if versions is not None:
+        statement = statement.where(Student.version.in_(versions))
+    statement = statement.values(version=Student.version + 1, **values).returning(
+        Student.id, Student.first_name, Student.last_name, Student.group_id, Student.version
+    )
+    row = session.execute(statement, execution_options={'synchronize_session': False}).first()
+    session.commit()
+    if row is not None:
+        read_model.student_saved(row.id, row.first_name, row.last_name, row.group_id, row.version)
+        # The student tag covers the roster of the previous group, the group tag the one it moved to
+        moved_to = [values['group_id']] if values.get('group_id') is not None else []
+        response_cache.invalidate(groups=moved_to, students=[row.id])
+    return row
+
 def delete_student_by_id(session, student_id):
     """
     Deletes a student by ID.
     Returns True if deletion was successful, False otherwise.
     """
-    student = session.query(Student).filter(Student.id == student_id).first()
-    if not student:
-        return False
-    session.delete(student)
+    deleted = session.execute(delete(Student).where(Student.id == student_id)).rowcount
+    session.commit()
+    if deleted:
+        read_model.students_deleted([student_id])
+        response_cache.invalidate(students=[student_id])
+    return deleted > 0
+
+def delete_students(session, group_id=None, student_ids=None):
+    """
+    Deletes every student matching the given group and/or list of IDs in a single statement.
+    Course enrollments are removed by the ON DELETE CASCADE on student_courses.
+    Returns the IDs of the deleted students.
+    """
+    statement = delete(Student)
+    if group_id is not None:
+        statement = statement.where(Student.group_id == group_id)
+    if student_ids is not None:
+        statement = statement.where(Student.id.in_(student_ids))
+    statement = statement.returning(Student.id)
+    deleted_ids = [row.id for row in session.execute(statement, execution_options={'synchronize_session': False})]
     session.commit()
-    return True
+    read_model.students_deleted(deleted_ids)
+    response_cache.invalidate(students=deleted_ids)
+    return deleted_ids
+
+def reassign_students(session, group_id, new_group_id, student_ids=None):
+    """
+    Moves all students of a group, or only the given ones, to another group in a single statement.
+    Raises IntegrityError if the target group does not exist.
+    Returns the IDs of the moved students.
+    """
+    statement = update(Student).where(Student.group_id == group_id)
+    if student_ids is not None:
+        statement = statement.where(Student.id.in_(student_ids))
+    statement = statement.values(group_id=new_group_id, version=Student.version + 1)
+    statement = statement.returning(Student.id, Student.version)
+    moved = session.execute(statement, execution_options={'synchronize_session': False}).all()
+    session.commit()
+    moved_ids = [row.id for row in moved]
+    read_model.students_moved([(row.id, row.version) for row in moved], new_group_id)
+    if moved_ids:
+        response_cache.invalidate(groups=[new_group_id], students=moved_ids)
+    return moved_ids
+
+def _insert(session, table):
+    """
+    INSERT with ON CONFLICT support for the dialects the app runs on (PostgreSQL and embedded SQLite).
+    """
+    dialect = postgresql if session.get_bind().dialect.name == 'postgresql' else sqlite
+    return dialect.insert(table)
 
 def add_student_to_course(session, student_id, course_id):
     """
-    Enrolls a student in a course.
-    Returns True if successful, False otherwise.
+    Enrolls a student in a course with a single INSERT ... ON CONFLICT DO NOTHING.
+    Returns True if successful, False if the student or course does not exist or the student is already enrolled.
     """
-    student = session.query(Student).filter(Student.id == student_id).first()
-    course = session.query(Course).filter(Course.id == course_id).first()
-    if not student or not course:
+    statement = _insert(session, student_courses).values(student_id=student_id, course_id=course_id)
+    try:
+        inserted = session.execute(statement.on_conflict_do_nothing()).rowcount
+        session.commit()
+    except IntegrityError:
+        # Foreign key violation: unknown student or course
+        session.rollback()
         return False
-    if course in student.courses:
-        # Already enrolled
-        return False
-    student.courses.append(course)
-    session.commit()
-    return True
+    if inserted:
+        read_model.enrollment_added(student_id, course_id)
+        response_cache.invalidate(courses=[course_id], students=[student_id])
+    return bool(inserted)
 
 def remove_student_from_course(session, student_id, course_id):
     """
-    Removes a student from a course.
-    Returns True if successful, False otherwise.
+    Removes a student from a course with a single DELETE.
+    Returns True if successful, False if the student was not enrolled in the course.
     """
-    student = session.query(Student).filter(Student.id == student_id).first()
-    course = session.query(Course).filter(Course.id == course_id).first()
-    if not student or not course:
-        return False
-    if course not in student.courses:
-        # Not enrolled in the course
-        return False
-    student.courses.remove(course)
+    statement = delete(student_courses).where(
+        student_courses.c.student_id == student_id, student_courses.c.course_id == course_id
+    )
+    removed = session.execute(statement).rowcount
+    session.commit()
+    if removed:
+        read_model.enrollment_removed(student_id, course_id)
+        response_cache.invalidate(courses=[course_id], students=[student_id])
+    return bool(removed)
+
+def update_course(session, course_id, values, versions=None):
+    """
+    Updates a course with a single UPDATE ... RETURNING and bumps its version.
+    If versions is given, the row is only updated while its current version is one of them.
+    Returns the updated row, or None if no course matched.
+    """
+    statement = update(Course).where(Course.id == course_id)
+    if versions is not None:
+        statement = statement.where(Course.version.in_(versions))
+    statement = statement.values(version=Course.version + 1, **values).returning(Course.id, Course.name, Course.version)
+    row = session.execute(statement, execution_options={'synchronize_session': False}).first()
+    session.commit()
+    if row is not None:
+        read_model.course_saved(row.id, row.name)
+        response_cache.invalidate(courses=[row.id])
+    return row
+
+def delete_course(session, course_id, versions=None):
+    """
+    Deletes a course with a single DELETE ... RETURNING. Enrollments are removed by ON DELETE CASCADE.
+    If versions is given, the row is only deleted while its current version is one of them.
+    Returns True if a course was deleted.
+    """
+    statement = delete(Course).where(Course.id == course_id)
+    if versions is not None:
+        statement = statement.where(Course.version.in_(versions))
+    row = session.execute(statement.returning(Course.id), execution_options={'synchronize_session': False}).first()
     session.commit()
-    return True
+    if row is not None:
+        read_model.course_deleted(course_id)
+        response_cache.invalidate(courses=[course_id])
+    return row is not None
 
 def get_students_by_course_name(session, course_name):
     """
@@ -68,8 +173,13 @@ def get_students_by_course_name(session, course_name):
 
 def get_groups_with_student_count(session, max_count):
     """
-    Retrieves all groups with a student count less than or equal to max_count.
+    Retrieves (id, name, student_count) for all groups with a student count less than or equal to max_count.
+    Counted in the database with GROUP BY ... HAVING instead of loading every student.
     """
-    groups = session.query(Group).options(joinedload(Group.students)).all()
-    filtered_groups = [group for group in groups if len(group.students) <= max_count]
-    return filtered_groups
+    student_count = func.count(Student.id)
+    return session.query(Group.id, Group.name, student_count.label('student_count')) \
+        .outerjoin(Student, Student.group_id == Group.id) \
+        .group_by(Group.id, Group.name) \
+        .having(student_count <= max_count) \
+        .order_by(Group.id) \
+        .all()
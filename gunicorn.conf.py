@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for production serving:
+
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden through the environment variables below.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import Config
+
+wsgi_app = 'run:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Workers are separate processes; threads > 1 switches to the gthread worker so each process serves several requests
+# while waiting on the database. Keep workers * threads below the database's connection limit.
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+
+# The read model is per process and only sees other workers' writes when it reloads
+if Config.READ_MODEL and workers > 1 and Config.READ_MODEL_REFRESH_SECONDS <= 0:
+    raise RuntimeError('READ_MODEL with several workers requires READ_MODEL_REFRESH_SECONDS > 0, otherwise workers '
+                       'serve stale reads indefinitely')
+
+# Load the application once in the master so workers start fast and share its memory copy-on-write.
+# A preloaded application is not re-imported on HUP; see the README for deploying new code.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle each worker after this many requests (0 disables it); jitter keeps them from restarting together.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 2))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+
+
+def post_fork(server, worker):
+    from app.database import dispose_engine_after_fork
+
+    dispose_engine_after_fork()
@@ -0,0 +1,108 @@
+"""
+Benchmark of the vectorized enrollment analytics (app/analytics.py) on synthetic data, checked against a plain Python
+count on a sample. The data is also written to a temporary SQLite file (or to an empty database given with --database)
+to time EnrollmentArrays.load, the end-to-end cost of a cache rebuild.
+
+    python3 scripts/bench_analytics.py --enrollments 1000000 --courses 300 --groups 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+
+from sqlalchemy import create_engine, insert
+
+from app.analytics import EnrollmentArrays, _Results, co_enrollment, group_course_counts
+from app.database import Base
+from app.models import Group, Student, Course, student_courses
+
+
+def python_co_enrollment(student_index, course_index):
+    courses_by_student = {}
+    for student, course in zip(student_index.tolist(), course_index.tolist()):
+        courses_by_student.setdefault(student, []).append(course)
+    counts = Counter()
+    for courses in courses_by_student.values():
+        counts.update(combinations(sorted(courses), 2))
+    return counts
+
+
+def populate(engine, n_groups, n_courses, student_groups, student_index, course_index):
+    """
+    Inserts the synthetic data with ids starting at 1.
+    """
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Group), [{'id': i + 1, 'name': f'GR-{i}'} for i in range(n_groups)])
+        connection.execute(insert(Course), [{'id': i + 1, 'name': f'Course {i}'} for i in range(n_courses)])
+        connection.execute(insert(Student), [
+            {'id': i + 1, 'first_name': 'Bench', 'last_name': 'Student', 'group_id': int(group) + 1}
+            for i, group in enumerate(student_groups.tolist())
+        ])
+        connection.execute(insert(student_courses), [
+            {'student_id': student + 1, 'course_id': course + 1}
+            for student, course in zip(student_index.tolist(), course_index.tolist())
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--enrollments', type=int, default=1000000)
+    parser.add_argument('--courses', type=int, default=300)
+    parser.add_argument('--groups', type=int, default=500)
+    parser.add_argument('--courses-per-student', type=int, default=4)
+    parser.add_argument('--database', help='URL of an empty database to load from (default: temporary SQLite file)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_students = args.enrollments // args.courses_per_student
+    student_index = np.repeat(np.arange(n_students), args.courses_per_student)
+    # Distinct courses per student, drawn uniformly
+    course_index = np.concatenate([
+        rng.choice(args.courses, args.courses_per_student, replace=False) for _ in range(min(n_students, 2000))
+    ])
+    course_index = np.resize(course_index, len(student_index))
+    student_groups = rng.integers(0, args.groups, n_students)
+    group_index = student_groups[student_index]
+
+    started = time.perf_counter()
+    course_a, course_b, counts, _ = co_enrollment(student_index, course_index, args.courses)
+    co_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    group_course_counts(group_index, course_index, args.courses)
+    group_ms = (time.perf_counter() - started) * 1000
+
+    print(f'{len(student_index)} enrollments, {n_students} students, {args.courses} courses, {args.groups} groups')
+    print(f'co-enrollment matrix   {co_ms:8.1f} ms   ({len(counts)} course pairs)')
+    print(f'group x course counts  {group_ms:8.1f} ms')
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(args.database or f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        populate(engine, args.groups, args.courses, student_groups, student_index, course_index)
+        started = time.perf_counter()
+        arrays = EnrollmentArrays.load(engine)
+        load_ms = (time.perf_counter() - started) * 1000
+        results = _Results(arrays)
+        engine.dispose()
+    print(f'EnrollmentArrays.load  {load_ms:8.1f} ms   ({engine.dialect.name}, '
+          f'{len(arrays.student_index)} enrollments)')
+    print(f'cache rebuild total    {load_ms + results.compute_ms:8.1f} ms')
+
+    sample = student_index < 20000
+    expected = python_co_enrollment(student_index[sample], course_index[sample])
+    a, b, c, _ = co_enrollment(student_index[sample], course_index[sample], args.courses)
+    assert dict(zip(zip(a.tolist(), b.tolist()), c.tolist())) == dict(expected), 'Mismatch with the Python count'
+    print('Checked against a plain Python count on 20000 students')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Throughput comparison: Flask's development server (run.py) versus gunicorn with gunicorn.conf.py at several worker
+counts. The servers use SQLALCHEMY_DATABASE_URI from the environment / .env, so point it at a populated database.
+
+    python3 scripts/bench_serving.py --workers 1,2,4,8 --threads 1 --clients 16 --duration 10 --path /groups
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = '127.0.0.1'
+
+
+def wait_until_ready(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=1)
+            connection.request('GET', path)
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start within {timeout}s')
+
+
+def client_loop(args):
+    """
+    Sends requests back to back over one keep-alive connection until the deadline.
+    """
+    port, path, deadline = args
+    connection = http.client.HTTPConnection(HOST, port, timeout=10)
+    completed = errors = 0
+    while time.monotonic() < deadline:
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                completed += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+    return completed, errors
+
+
+def measure(port, path, clients, duration):
+    deadline = time.monotonic() + duration
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client_loop, [(port, path, deadline)] * clients)
+    completed = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return completed / duration, errors
+
+
+def run_server(command, port, path, clients, duration):
+    env = dict(os.environ, GUNICORN_ACCESS_LOG='')
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, path)
+        return measure(port, path, clients, duration)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4,8', help='Comma-separated gunicorn worker counts')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per measurement')
+    parser.add_argument('--path', default='/groups', help='Endpoint to request')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    rows = []
+    dev_server = [sys.executable, '-c', f"from run import app; app.run(host='{HOST}', port={args.port})"]
+    rows.append(('flask dev server', '-', '-') + run_server(dev_server, args.port, args.path, args.clients,
+                                                             args.duration))
+    for workers in [int(w) for w in args.workers.split(',')]:
+        gunicorn = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'{HOST}:{args.port}',
+                    '--workers', str(workers), '--threads', str(args.threads)]
+        rows.append(('gunicorn', workers, args.threads) + run_server(gunicorn, args.port, args.path, args.clients,
+                                                                     args.duration))
+
+    print(f"GET {args.path}, {args.clients} clients, {args.duration:g}s per run")
+    print(f"{'server':<18}{'workers':>8}{'threads':>8}{'req/s':>10}{'errors':>8}")
+    for server, workers, threads, throughput, errors in rows:
+        print(f"{server:<18}{workers:>8}{threads:>8}{throughput:>10.0f}{errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
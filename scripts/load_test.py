@@ -0,0 +1,277 @@
+"""
+Concurrent mixed-workload load generator for the HTTP API.
+
+Runs many concurrent clients against a running server, or against an in-process server started with --serve (which
+uses SQLALCHEMY_DATABASE_URI from the environment / .env, so it works with a local SQLite file or PostgreSQL).
+Prints throughput, error rates and latency percentiles for every reporting interval and a per-operation summary.
+Requests shed by admission control (503) are counted separately from errors.
+
+    python3 scripts/load_test.py --serve --profile registration --clients 32 --duration 60
+    python3 scripts/load_test.py --url http://localhost:8000 --profile browse --clients 64
+
+Profiles:
+    browse        read-heavy browsing: student details, group rosters, course rosters, listings
+    registration  registration window: enrollment bursts on a few popular courses plus new student sign-ups
+    admin         bulk admin edits: student updates, group reassignments, bulk deletes and course edits
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Statuses an operation can legitimately return; anything else 4xx counts as rejected, 503 as shed, other 5xx and
+# exceptions as errors.
+EXPECTED = {
+    'enroll': (200, 404),
+    'unenroll': (200, 404),
+    'student_detail': (200, 404),
+    'update_student': (200, 404),
+}
+
+
+class World:
+    """
+    IDs and names known to the clients. Seeded from the API and extended by the workload.
+    """
+
+    def __init__(self, base_url, groups, courses, students):
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self.groups = [g['id'] for g in requests.get(f'{base_url}/groups').json()]
+        self.courses = requests.get(f'{base_url}/courses').json()
+        self.students = [s['id'] for s in requests.get(f'{base_url}/students').json()]
+        self.created_students = []
+        while len(self.groups) < groups:
+            response = requests.post(f'{base_url}/groups', json={'name': f'LT-{uuid.uuid4().hex[:12]}'})
+            self.groups.append(self._created(response)['id'])
+        while len(self.courses) < courses:
+            response = requests.post(f'{base_url}/courses', json={'name': f'LT-Course-{uuid.uuid4().hex[:12]}',
+                                                                   'description': 'Load test course'})
+            self.courses.append(self._created(response))
+        while len(self.students) < students:
+            response = requests.post(f'{base_url}/students', json={'first_name': 'Load', 'last_name': 'Test',
+                                                                    'group_id': random.choice(self.groups)})
+            self.students.append(self._created(response)['id'])
+        # A handful of popular courses receive most of the registration traffic
+        self.hot_courses = self.courses[:max(1, len(self.courses) // 10)]
+
+    @staticmethod
+    def _created(response):
+        assert response.status_code == 201, f'Seeding failed: {response.status_code} {response.text}'
+        return response.json()
+
+    def student(self):
+        with self._lock:
+            return random.choice(self.students)
+
+    def sample_students(self, count):
+        with self._lock:
+            return random.sample(self.students, min(count, len(self.students)))
+
+    def group(self):
+        return random.choice(self.groups)
+
+    def course(self, hot=False):
+        return random.choice(self.hot_courses if hot else self.courses)
+
+    def add_student(self, student_id):
+        with self._lock:
+            self.students.append(student_id)
+            self.created_students.append(student_id)
+
+    def take_created_students(self, count):
+        with self._lock:
+            taken = self.created_students[:count]
+            del self.created_students[:count]
+            for student_id in taken:
+                self.students.remove(student_id)
+        return taken
+
+
+def create_student(session, world):
+    response = session.post(f'{world.base_url}/students', json={
+        'first_name': 'Load', 'last_name': uuid.uuid4().hex[:8], 'group_id': world.group()
+    })
+    if response.status_code == 201:
+        world.add_student(response.json()['id'])
+    return response
+
+
+def bulk_delete_students(session, world):
+    student_ids = world.take_created_students(5)
+    if not student_ids:
+        return create_student(session, world)
+    return session.delete(f'{world.base_url}/students', params={'ids': ','.join(map(str, student_ids))})
+
+
+def reassign_students(session, world):
+    source, target = world.group(), world.group()
+    student_ids = world.sample_students(10)
+    return session.put(f'{world.base_url}/groups/{source}/students',
+                       json={'group_id': target, 'student_ids': student_ids})
+
+
+PROFILES = {
+    'browse': [
+        (40, 'student_detail', lambda s, w: s.get(f'{w.base_url}/students/{w.student()}')),
+        (25, 'group_roster', lambda s, w: s.get(f'{w.base_url}/groups/{w.group()}/students')),
+        (15, 'course_roster', lambda s, w: s.get(f"{w.base_url}/students_by_course/{w.course()['name']}")),
+        (10, 'groups_max', lambda s, w: s.get(f'{w.base_url}/groups/with_max_students', params={'max_count': 30})),
+        (10, 'course_list', lambda s, w: s.get(f'{w.base_url}/courses')),
+    ],
+    'registration': [
+        (45, 'enroll', lambda s, w: s.post(f"{w.base_url}/students/{w.student()}/courses/{w.course(True)['id']}")),
+        (15, 'unenroll',
+         lambda s, w: s.delete(f"{w.base_url}/students/{w.student()}/courses/{w.course(True)['id']}")),
+        (15, 'create_student', create_student),
+        (25, 'student_detail', lambda s, w: s.get(f'{w.base_url}/students/{w.student()}')),
+    ],
+    'admin': [
+        (30, 'update_student', lambda s, w: s.put(f'{w.base_url}/students/{w.student()}',
+                                                  json={'first_name': 'Edited', 'group_id': w.group()})),
+        (15, 'reassign_students', reassign_students),
+        (25, 'create_student', create_student),
+        (10, 'bulk_delete', bulk_delete_students),
+        (10, 'update_course', lambda s, w: s.put(f"{w.base_url}/courses/{w.course()['id']}",
+                                                 json={'description': uuid.uuid4().hex})),
+        (10, 'group_roster', lambda s, w: s.get(f'{w.base_url}/groups/{w.group()}/students')),
+    ],
+}
+
+
+class Recorder:
+    """
+    Collects latencies and outcomes, per reporting interval and per operation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.interval = []
+        self.interval_errors = 0
+        self.interval_rejected = 0
+        self.interval_shed = 0
+        self.operations = defaultdict(lambda: {
+            'latencies': [], 'errors': 0, 'rejected': 0, 'shed': 0, 'statuses': defaultdict(int)
+        })
+
+    def record(self, operation, latency, status):
+        with self._lock:
+            stats = self.operations[operation]
+            stats['latencies'].append(latency)
+            stats['statuses'][status] += 1
+            self.interval.append(latency)
+            if status == 503:
+                stats['shed'] += 1
+                self.interval_shed += 1
+            elif status is None or status >= 500:
+                stats['errors'] += 1
+                self.interval_errors += 1
+            elif status >= 400 and status not in EXPECTED.get(operation, ()):
+                stats['rejected'] += 1
+                self.interval_rejected += 1
+
+    def take_interval(self):
+        with self._lock:
+            latencies, errors, rejected, shed = (self.interval, self.interval_errors, self.interval_rejected,
+                                                 self.interval_shed)
+            self.interval, self.interval_errors, self.interval_rejected, self.interval_shed = [], 0, 0, 0
+        return latencies, errors, rejected, shed
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def client(world, profile, recorder, deadline):
+    weights = [weight for weight, _, _ in profile]
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        _, operation, send = random.choices(profile, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = send(session, world).status_code
+        except requests.RequestException:
+            status = None
+        recorder.record(operation, (time.perf_counter() - started) * 1000, status)
+
+
+def serve_in_process(port):
+    from werkzeug.serving import make_server
+
+    from app import create_app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', port, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000', help='Base URL of a running server')
+    parser.add_argument('--serve', action='store_true', help='Start the app in-process instead of using --url')
+    parser.add_argument('--port', type=int, default=5077, help='Port for --serve')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='browse')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--interval', type=float, default=5, help='Seconds between reports')
+    parser.add_argument('--groups', type=int, default=20, help='Minimum groups to seed')
+    parser.add_argument('--courses', type=int, default=30, help='Minimum courses to seed')
+    parser.add_argument('--students', type=int, default=500, help='Minimum students to seed')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url.rstrip('/')
+    if args.serve:
+        server, base_url = serve_in_process(args.port)
+
+    print(f'Seeding {base_url} ...')
+    world = World(base_url, args.groups, args.courses, args.students)
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=client, args=(world, PROFILES[args.profile], recorder, deadline), daemon=True)
+               for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+
+    print(f"Profile '{args.profile}', {args.clients} clients, {args.duration:g}s")
+    print(f"{'time':>6}{'req/s':>9}{'errors':>8}{'rejected':>10}{'shed':>7}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    started = last_report = time.monotonic()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(min(args.interval, max(0.0, deadline - time.monotonic()) + 0.1))
+        latencies, errors, rejected, shed = recorder.take_interval()
+        now = time.monotonic()
+        throughput = len(latencies) / (now - last_report)
+        last_report = now
+        latencies.sort()
+        print(f'{now - started:>6.0f}{throughput:>9.0f}{errors:>8}{rejected:>10}{shed:>7}'
+              f'{percentile(latencies, 0.50):>9.1f}{percentile(latencies, 0.95):>9.1f}'
+              f'{percentile(latencies, 0.99):>9.1f}{(latencies[-1] if latencies else 0):>9.1f}')
+
+    print()
+    print(f"{'operation':<20}{'requests':>10}{'errors':>8}{'rejected':>10}{'shed':>7}"
+          f"{'p50 ms':>9}{'p99 ms':>9}  statuses")
+    for operation, stats in sorted(recorder.operations.items()):
+        latencies = sorted(stats['latencies'])
+        statuses = ', '.join(f'{status}: {count}' for status, count in sorted(stats['statuses'].items(), key=str))
+        print(f"{operation:<20}{len(latencies):>10}{stats['errors']:>8}{stats['rejected']:>10}{stats['shed']:>7}"
+              f"{percentile(latencies, 0.50):>9.1f}{percentile(latencies, 0.99):>9.1f}  {statuses}")
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
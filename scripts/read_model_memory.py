@@ -0,0 +1,62 @@
+"""
+Memory-footprint report of the in-memory read model (app/read_model.py).
+
+Without arguments it builds the model from the database in SQLALCHEMY_DATABASE_URI. With --synthetic it builds one
+from generated data instead, to size the model before loading a real dataset:
+
+    python3 scripts/read_model_memory.py --synthetic --students 200000 --courses 300 --groups 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_model(ReadModel, n_students, n_courses, n_groups, courses_per_student):
+    first_names = [f'First{i}' for i in range(500)]
+    last_names = [f'Last{i}' for i in range(2000)]
+    groups = [(i, f'GR-{i:04d}') for i in range(1, n_groups + 1)]
+    courses = [(i, f'Course {i}') for i in range(1, n_courses + 1)]
+    students = [(i, random.choice(first_names), random.choice(last_names), random.randint(1, n_groups), 1)
+                for i in range(1, n_students + 1)]
+    enrollments = [(student_id, course_id)
+                   for student_id in range(1, n_students + 1)
+                   for course_id in random.sample(range(1, n_courses + 1), courses_per_student)]
+    return ReadModel(groups, courses, students, enrollments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', action='store_true', help='Use generated data instead of the database')
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--groups', type=int, default=400)
+    parser.add_argument('--courses-per-student', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite://')
+    from app.read_model import ReadModel
+
+    started = time.perf_counter()
+    if args.synthetic:
+        model = synthetic_model(ReadModel, args.students, args.courses, args.groups, args.courses_per_student)
+    else:
+        from app.database import engine
+        model = ReadModel.load(engine)
+    elapsed = time.perf_counter() - started
+
+    report = model.memory_report()
+    print(f"{report['students']} students, {report['groups']} groups, {report['courses']} courses, "
+          f"{report['enrollments']} enrollments (built in {elapsed:.2f}s)")
+    for column, size in sorted(report['bytes'].items(), key=lambda item: -item[1]):
+        print(f"  {column:<20}{size / 1024:>12.1f} KiB")
+    print(f"  {'total':<20}{report['total_bytes'] / 1024:>12.1f} KiB "
+          f"({report['total_bytes'] / max(report['students'], 1):.0f} bytes per student)")
+
+
+if __name__ == '__main__':
+    main()
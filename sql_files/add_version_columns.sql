@@ -0,0 +1,5 @@
+\c student_management
+
+-- Row versions used for optimistic concurrency (ETag / If-Match) on PUT /students/<id> and PUT/DELETE /courses/<id>
+ALTER TABLE students ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
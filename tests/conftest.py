@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    """
+    Fixture to create the application once per test session against a temporary embedded SQLite database.
+    The URI is set before `app` is first imported, because the engine is created at import time. Sessions that only
+    run tests/test_api.py, which talks to a running server, never create the database or touch the environment.
+    """
+    database_dir = tempfile.mkdtemp(prefix="student_management_")
+    configured_uri = os.environ.get("SQLALCHEMY_DATABASE_URI")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(database_dir, 'test.db')}"
+    try:
+        from app import create_app
+        from app.database import engine
+
+        flask_app = create_app()
+        yield flask_app
+        # Cleanup: Close the pooled connections before removing the database files
+        engine.dispose()
+    finally:
+        shutil.rmtree(database_dir, ignore_errors=True)
+        if configured_uri is None:
+            os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        else:
+            os.environ["SQLALCHEMY_DATABASE_URI"] = configured_uri
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
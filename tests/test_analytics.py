@@ -0,0 +1,23 @@
+"""
+In-process tests of the enrollment analytics (app/analytics.py).
+"""
+
+
+def test_enrollments_of_unloaded_rows_are_ignored(flask_app):
+    """
+    Test that enrollments referencing students or courses missing from the loaded rows are dropped instead of failing
+    or being counted against another student.
+    """
+    from app.analytics import EnrollmentArrays, co_enrollment
+
+    groups = [(1, "G1")]
+    courses = [(10, "A"), (20, "B")]
+    students = [(5, 1), (7, 1)]
+    enrollments = [(5, 10), (5, 20), (7, 10), (6, 10), (6, 20), (9, 20), (7, 30)]
+    arrays = EnrollmentArrays(groups, courses, students, enrollments)
+
+    assert len(arrays.student_index) == 3
+    course_a, course_b, counts, totals = co_enrollment(arrays.student_index, arrays.course_index, 2)
+    assert counts.tolist() == [1], "Unknown student 6 was counted as a known one"
+    assert totals.tolist() == [2, 1]
+    assert arrays.group_index.tolist() == [0, 0, 0]
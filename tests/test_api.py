@@ -1,6 +1,7 @@
 import pytest
 import requests
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "http://localhost:5000"
 
@@ -187,6 +188,40 @@ def test_update_student(created_student):
     assert student["last_name"] == updated_last_name, "Last name was not updated"
 
 
+def test_update_student_if_match(created_student):
+    """
+    Test that a stale If-Match version is rejected and the current ETag is accepted.
+    """
+    student_id = created_student["id"]
+    response = requests.get(f"{BASE_URL}/students/{student_id}")
+    etag = response.headers["ETag"]
+
+    response = requests.put(f"{BASE_URL}/students/{student_id}", json={"first_name": "Stale"},
+                            headers={"If-Match": '"0"'})
+    assert response.status_code == 412, f"Stale version was accepted: {response.text}"
+
+    response = requests.put(f"{BASE_URL}/students/{student_id}", json={"first_name": "Weak"},
+                            headers={"If-Match": f"W/{etag}"})
+    assert response.status_code == 412, f"Weak tag was accepted by If-Match: {response.text}"
+
+    response = requests.put(f"{BASE_URL}/students/{student_id}", json={"first_name": "Current"},
+                            headers={"If-Match": etag})
+    assert response.status_code == 200, f"Failed to update student: {response.text}"
+    assert response.headers["ETag"] != etag, "Version was not bumped"
+
+    response = requests.get(f"{BASE_URL}/students/{student_id}")
+    assert response.json()["first_name"] == "Current"
+    assert response.json()["group_id"] == created_student["group_id"], "Omitted group_id changed the group"
+
+
+def test_update_student_unknown_group(created_student):
+    """
+    Test that moving a student to a nonexistent group returns 404.
+    """
+    response = requests.put(f"{BASE_URL}/students/{created_student['id']}", json={"group_id": 999999999})
+    assert response.status_code == 404, f"Unknown group was accepted: {response.text}"
+
+
 def test_add_student_to_course(created_student, created_course):
     """
     Test adding a course to a student.
@@ -330,3 +365,290 @@ def test_get_students_by_course_name(created_group, created_course, created_stud
     # Cleanup: Remove the student from the course
     response = requests.delete(f"{BASE_URL}/students/{student_id}/courses/{course_id}")
     assert response.status_code == 200, f"Failed to remove course from student: {response.text}"
+
+
+def test_bulk_delete_students_by_ids(created_group):
+    """
+    Test deleting several students at once by their IDs.
+    """
+    student_ids = []
+    for _ in range(3):
+        payload = {"first_name": "BulkFirstName", "last_name": "BulkLastName", "group_id": created_group["id"]}
+        response = requests.post(f"{BASE_URL}/students", json=payload)
+        assert response.status_code == 201, f"Failed to create student: {response.text}"
+        student_ids.append(response.json()["id"])
+
+    response = requests.delete(f"{BASE_URL}/students", params={"ids": ",".join(map(str, student_ids))})
+    assert response.status_code == 200, f"Failed to bulk delete students: {response.text}"
+    assert response.json()["deleted"] == 3, "Not all students were deleted"
+
+    for student_id in student_ids:
+        response = requests.get(f"{BASE_URL}/students/{student_id}")
+        assert response.status_code == 404, "Student was not deleted successfully"
+
+
+def test_bulk_delete_students_requires_filter():
+    """
+    Test that bulk deletion refuses to run without a group_id or ids filter.
+    """
+    response = requests.delete(f"{BASE_URL}/students")
+    assert response.status_code == 400, "Bulk delete without a filter should be rejected"
+
+
+def test_reassign_group_students(created_course):
+    """
+    Test moving all students of one group to another group.
+    """
+    source = requests.post(f"{BASE_URL}/groups", json={"name": generate_unique_name("Group")}).json()
+    target = requests.post(f"{BASE_URL}/groups", json={"name": generate_unique_name("Group")}).json()
+    payload = {"first_name": "MoveFirstName", "last_name": "MoveLastName", "group_id": source["id"]}
+    student = requests.post(f"{BASE_URL}/students", json=payload).json()
+    requests.post(f"{BASE_URL}/students/{student['id']}/courses/{created_course['id']}")
+
+    response = requests.put(f"{BASE_URL}/groups/{source['id']}/students", json={"group_id": target["id"]})
+    assert response.status_code == 200, f"Failed to reassign students: {response.text}"
+    assert response.json()["updated"] == 1, "Student was not reassigned"
+
+    response = requests.get(f"{BASE_URL}/groups/{target['id']}/students")
+    students = response.json()["students"]
+    assert [s["id"] for s in students] == [student["id"]], "Student not found in target group"
+    assert created_course["name"] in students[0]["courses"], "Courses were lost while reassigning"
+
+    # Bulk deleting the group also drops the course enrollment through ON DELETE CASCADE
+    response = requests.delete(f"{BASE_URL}/students", params={"group_id": target["id"]})
+    assert response.status_code == 200, f"Failed to bulk delete students: {response.text}"
+    assert response.json()["deleted"] == 1, "Student was not deleted"
+
+
+def test_reassign_group_students_unknown_target(created_group):
+    """
+    Test that moving students to a group that does not exist returns 404.
+    """
+    payload = {"first_name": "MoveFirstName", "last_name": "MoveLastName", "group_id": created_group["id"]}
+    student = requests.post(f"{BASE_URL}/students", json=payload).json()
+
+    response = requests.put(f"{BASE_URL}/groups/{created_group['id']}/students",
+                            json={"group_id": 999999999, "student_ids": [student["id"]]})
+    assert response.status_code == 404, "Reassigning to a missing group should return 404"
+
+    response = requests.delete(f"{BASE_URL}/students/{student['id']}")
+    assert response.status_code == 200, f"Failed to delete student: {response.text}"
+
+
+def test_reassign_group_students_empty_selection(created_group):
+    """
+    Test that an explicit empty student_ids list moves nobody.
+    """
+    target = requests.post(f"{BASE_URL}/groups", json={"name": generate_unique_name("Group")}).json()
+    payload = {"first_name": "MoveFirstName", "last_name": "MoveLastName", "group_id": created_group["id"]}
+    student = requests.post(f"{BASE_URL}/students", json=payload).json()
+
+    response = requests.put(f"{BASE_URL}/groups/{created_group['id']}/students",
+                            json={"group_id": target["id"], "student_ids": []})
+    assert response.status_code == 200, f"Failed to reassign students: {response.text}"
+    assert response.json()["updated"] == 0, "An empty selection should not move any student"
+
+    response = requests.get(f"{BASE_URL}/students/{student['id']}")
+    assert response.json()["group_id"] == created_group["id"], "Student was moved"
+
+    response = requests.delete(f"{BASE_URL}/students/{student['id']}")
+    assert response.status_code == 200, f"Failed to delete student: {response.text}"
+
+
+def test_reassign_group_students_null_target(created_group):
+    """
+    Test that a null target group_id is rejected instead of clearing the group of every student.
+    """
+    payload = {"first_name": "MoveFirstName", "last_name": "MoveLastName", "group_id": created_group["id"]}
+    student = requests.post(f"{BASE_URL}/students", json=payload).json()
+
+    response = requests.put(f"{BASE_URL}/groups/{created_group['id']}/students", json={"group_id": None})
+    assert response.status_code == 400, "A null target group_id should be rejected"
+
+    response = requests.get(f"{BASE_URL}/students/{student['id']}")
+    assert response.json()["group_id"] == created_group["id"], "Student was moved"
+
+    response = requests.delete(f"{BASE_URL}/students/{student['id']}")
+    assert response.status_code == 200, f"Failed to delete student: {response.text}"
+
+
+def test_reassign_empty_group_unknown_target():
+    """
+    Test that moving the students of an empty group to a group that does not exist returns 404, not 0 updated.
+    """
+    response = requests.post(f"{BASE_URL}/groups", json={"name": generate_unique_name("Group")})
+    assert response.status_code == 201, f"Failed to create group: {response.text}"
+    group_id = response.json()["id"]
+
+    response = requests.put(f"{BASE_URL}/groups/{group_id}/students", json={"group_id": 999999999})
+    assert response.status_code == 404, f"Reassigning to a missing group should return 404: {response.text}"
+
+
+def test_create_student_validation_errors(created_group):
+    """
+    Test that invalid request bodies are rejected with the per-argument error messages.
+    """
+    response = requests.post(f"{BASE_URL}/students", json={"first_name": "TestFirstName"})
+    assert response.status_code == 400, "Missing last_name should be rejected"
+    assert response.json()["message"] == {"last_name": "Last name is required"}
+
+    payload = {"first_name": "TestFirstName", "last_name": "TestLastName", "group_id": "not-a-number"}
+    response = requests.post(f"{BASE_URL}/students", json=payload)
+    assert response.status_code == 400, "Non-integer group_id should be rejected"
+    assert response.json()["message"] == {"group_id": "Group ID must be an integer"}
+
+
+def test_slow_query_log(created_student):
+    """
+    Test the slow-query log. Only runs when the server was started with SQL_PROFILING=true.
+    """
+    response = requests.get(f"{BASE_URL}/admin/slow_queries")
+    if response.status_code == 404:
+        pytest.skip("Slow-query log is disabled (SQL_PROFILING is not set)")
+    assert response.status_code == 200, f"Failed to get slow queries: {response.text}"
+
+    log = response.json()
+    assert isinstance(log["entries"], list), "Entries should be a list"
+    for entry in log["entries"]:
+        assert entry["duration_ms"] >= log["threshold_ms"], "Entry is faster than the threshold"
+        assert "statement" in entry and "endpoint" in entry, "Entry is missing fields"
+
+
+def test_read_model_report(created_student):
+    """
+    Test the read model's memory report. Only runs when the server was started with READ_MODEL=true.
+    """
+    response = requests.get(f"{BASE_URL}/admin/read_model")
+    if response.status_code == 404:
+        pytest.skip("Read model is disabled (READ_MODEL is not set)")
+    assert response.status_code == 200, f"Failed to get read model report: {response.text}"
+
+    report = response.json()
+    assert report["students"] >= 1, "Created student is missing from the read model"
+    assert report["total_bytes"] == sum(report["bytes"].values()), "Total does not match the column sizes"
+
+
+def test_gzip_compression(created_group):
+    """
+    Test that large responses are gzipped only when the client accepts gzip.
+    """
+    student_ids = []
+    for _ in range(10):
+        payload = {"first_name": "GzipFirstName", "last_name": "GzipLastName", "group_id": created_group["id"]}
+        response = requests.post(f"{BASE_URL}/students", json=payload)
+        assert response.status_code == 201, f"Failed to create student: {response.text}"
+        student_ids.append(response.json()["id"])
+
+    url = f"{BASE_URL}/groups/{created_group['id']}/students"
+    response = requests.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200, f"Failed to get students in group: {response.text}"
+    assert response.headers.get("Content-Encoding") == "gzip", "Large response was not compressed"
+    assert "Accept-Encoding" in response.headers.get("Vary", ""), "Vary header is missing"
+    assert len(response.json()["students"]) >= 10, "Compressed body did not decode"
+
+    response = requests.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers, "Response was compressed without gzip being accepted"
+
+    response = requests.delete(f"{BASE_URL}/students", params={"ids": ",".join(map(str, student_ids))})
+    assert response.status_code == 200, f"Failed to bulk delete students: {response.text}"
+
+
+def test_co_enrollment_analytics(created_group):
+    """
+    Test that the co-enrollment matrix and group course counts reflect a new enrollment.
+    """
+    courses = []
+    for _ in range(2):
+        payload = {"name": generate_unique_name("Course"), "description": "Analytics course"}
+        response = requests.post(f"{BASE_URL}/courses", json=payload)
+        assert response.status_code == 201, f"Failed to create course: {response.text}"
+        courses.append(response.json())
+    payload = {"first_name": "StatsFirstName", "last_name": "StatsLastName", "group_id": created_group["id"]}
+    student = requests.post(f"{BASE_URL}/students", json=payload).json()
+    for course in courses:
+        response = requests.post(f"{BASE_URL}/students/{student['id']}/courses/{course['id']}")
+        assert response.status_code == 200, f"Failed to enroll student: {response.text}"
+
+    response = requests.get(f"{BASE_URL}/analytics/co_enrollment")
+    assert response.status_code == 200, f"Failed to get co-enrollment: {response.text}"
+    names = {courses[0]["name"], courses[1]["name"]}
+    pairs = [p for p in response.json()["pairs"] if {p["course_a"], p["course_b"]} == names]
+    assert len(pairs) == 1 and pairs[0]["students"] == 1, "Co-enrollment pair not counted"
+
+    response = requests.get(f"{BASE_URL}/analytics/group_courses")
+    assert response.status_code == 200, f"Failed to get group courses: {response.text}"
+    group = next(g for g in response.json()["groups"] if g["group_id"] == created_group["id"])
+    assert group["courses"].get(courses[0]["name"]) == 1, "Group course count not updated"
+
+    requests.delete(f"{BASE_URL}/students/{student['id']}")
+    for course in courses:
+        requests.delete(f"{BASE_URL}/courses/{course['id']}")
+
+
+def test_roster_reflects_writes(created_group, created_course):
+    """
+    Test that repeated roster reads see every write in between, whether or not the response cache is enabled.
+    """
+    group_id = created_group["id"]
+    course_name = created_course["name"]
+    response = requests.post(f"{BASE_URL}/students", json={"first_name": "Cached", "last_name": "Roster",
+                                                           "group_id": group_id})
+    student_id = response.json()["id"]
+    requests.get(f"{BASE_URL}/groups/{group_id}/students")
+    requests.get(f"{BASE_URL}/students_by_course/{course_name}")
+
+    requests.post(f"{BASE_URL}/students/{student_id}/courses/{created_course['id']}")
+    roster = requests.get(f"{BASE_URL}/students_by_course/{course_name}").json()
+    assert [s["id"] for s in roster] == [student_id], "Course roster is stale after enrollment"
+    students = requests.get(f"{BASE_URL}/groups/{group_id}/students").json()["students"]
+    assert next(s for s in students if s["id"] == student_id)["courses"] == [course_name], \
+        "Group roster is stale after enrollment"
+
+    requests.put(f"{BASE_URL}/students/{student_id}", json={"last_name": "Renamed"})
+    roster = requests.get(f"{BASE_URL}/students_by_course/{course_name}").json()
+    assert roster[0]["last_name"] == "Renamed", "Course roster is stale after update"
+
+    requests.delete(f"{BASE_URL}/students/{student_id}")
+    students = requests.get(f"{BASE_URL}/groups/{group_id}/students").json()["students"]
+    assert student_id not in [s["id"] for s in students], "Group roster is stale after delete"
+    assert requests.get(f"{BASE_URL}/students_by_course/{course_name}").json() == []
+
+
+def test_response_cache_report(created_group):
+    """
+    Test that a repeated roster read is a cache hit. Only runs when the server was started with RESPONSE_CACHE=true.
+    """
+    response = requests.get(f"{BASE_URL}/admin/response_cache")
+    if response.status_code == 404:
+        pytest.skip("Response cache is disabled (RESPONSE_CACHE is not set)")
+    hits = response.json()["hits"]
+
+    first = requests.get(f"{BASE_URL}/groups/{created_group['id']}/students")
+    second = requests.get(f"{BASE_URL}/groups/{created_group['id']}/students")
+    assert second.json() == first.json()
+    report = requests.get(f"{BASE_URL}/admin/response_cache").json()
+    assert report["hits"] >= hits + 1, "Repeated roster read was not served from the cache"
+    assert report["bytes"] >= report["body_bytes"] > 0
+
+
+def test_admission_control():
+    """
+    Test that concurrent requests are either served or shed with 503 and Retry-After.
+    Only runs when the server was started with ADMISSION_CONTROL=true.
+    """
+    response = requests.get(f"{BASE_URL}/admin/admission")
+    if response.status_code == 404:
+        pytest.skip("Admission control is disabled (ADMISSION_CONTROL is not set)")
+    admitted = response.json()["list"]["admitted"]
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        responses = list(pool.map(lambda _: requests.get(f"{BASE_URL}/students"), range(64)))
+    for response in responses:
+        assert response.status_code in (200, 503), f"Unexpected status: {response.status_code}"
+        if response.status_code == 503:
+            assert int(response.headers["Retry-After"]) >= 0
+
+    report = requests.get(f"{BASE_URL}/admin/admission").json()["list"]
+    served = sum(r.status_code == 200 for r in responses)
+    assert report["admitted"] - admitted >= served
+    assert report["in_flight"] == 0, "Admission slots were not released"
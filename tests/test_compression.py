@@ -0,0 +1,38 @@
+"""
+In-process tests of the response compression hook (app/compression.py).
+"""
+import gzip
+
+from flask import Flask, Response, request
+
+
+def create_compressed_app():
+    from app.compression import compress_response
+
+    app = Flask(__name__)
+    app.config.update(COMPRESSION_MIN_SIZE=500, COMPRESSION_LEVEL=6)
+    app.after_request(compress_response)
+
+    @app.route("/file")
+    def file():
+        response = Response(b"x" * 10000, mimetype="text/plain")
+        return response.make_conditional(request, accept_ranges=True, complete_length=10000)
+
+    return app
+
+
+def test_partial_content_is_not_compressed(flask_app):
+    """
+    Test that a 206 response keeps its uncompressed body, since Content-Range describes uncompressed offsets.
+    """
+    client = create_compressed_app().test_client()
+
+    response = client.get("/file", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert "Content-Encoding" not in response.headers, "Partial response was compressed"
+    assert response.headers["Content-Range"] == "bytes 0-99/10000"
+    assert response.data == b"x" * 100
+
+    response = client.get("/file", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == b"x" * 10000
@@ -0,0 +1,151 @@
+"""
+In-process tests of the API running on embedded SQLite (app/embedded.py), using Flask's test client instead of the
+server on localhost:5000 that tests/test_api.py expects.
+"""
+import threading
+import uuid
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+
+def generate_unique_name(prefix):
+    return f"{prefix}-{uuid.uuid4()}"
+
+
+def create_group(client):
+    response = client.post("/groups", json={"name": generate_unique_name("Group")})
+    assert response.status_code == 201, f"Failed to create group: {response.text}"
+    return response.get_json()
+
+
+def create_student(client, group_id=None):
+    response = client.post("/students", json={"first_name": "Embedded", "last_name": "Student", "group_id": group_id})
+    assert response.status_code == 201, f"Failed to create student: {response.text}"
+    return response.get_json()
+
+
+def test_connection_pragmas(flask_app):
+    """
+    Test that every connection is tuned for concurrent access.
+    """
+    from app import embedded
+    from app.config import Config
+    from app.database import engine
+
+    with engine.connect() as connection:
+        settings = embedded.settings(connection)
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1, "synchronous is not NORMAL"
+    assert settings["mmap_size"] == Config.SQLITE_MMAP_SIZE
+    assert settings["cache_size"] == -Config.SQLITE_CACHE_SIZE_KB
+    assert settings["busy_timeout"] == Config.SQLITE_BUSY_TIMEOUT_MS
+    assert settings["foreign_keys"] == 1
+    assert isinstance(engine.pool, QueuePool)
+
+
+def test_memory_database_is_shared_across_threads(flask_app):
+    """
+    Test that an in-memory database is one database for all threads rather than one per thread.
+    """
+    from app import embedded
+
+    engine = create_engine("sqlite://", **embedded.engine_options("sqlite://", pool_size=4))
+    assert isinstance(engine.pool, StaticPool)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE shared (id INTEGER)"))
+
+    counts = []
+
+    def count_rows():
+        with engine.connect() as connection:
+            counts.append(connection.execute(text("SELECT COUNT(*) FROM shared")).scalar())
+
+    thread = threading.Thread(target=count_rows)
+    thread.start()
+    thread.join()
+    assert counts == [0], "The table is not visible from another thread"
+
+
+def test_student_lifecycle(client):
+    """
+    Test creating, reading, updating and deleting a student in process.
+    """
+    group = create_group(client)
+    student = create_student(client, group["id"])
+
+    response = client.get(f"/students/{student['id']}")
+    assert response.status_code == 200
+    assert response.get_json()["group_id"] == group["id"]
+
+    response = client.put(f"/students/{student['id']}", json={"last_name": "Renamed"},
+                          headers={"If-Match": response.headers["ETag"]})
+    assert response.status_code == 200, f"Failed to update student: {response.text}"
+    assert client.get(f"/students/{student['id']}").get_json()["last_name"] == "Renamed"
+
+    response = client.delete(f"/students/{student['id']}")
+    assert response.status_code == 200
+    assert client.get(f"/students/{student['id']}").status_code == 404
+
+
+def test_enrollment_upsert(client):
+    """
+    Test that enrolling twice inserts one row and unknown students or courses are rejected.
+    """
+    student = create_student(client)
+    response = client.post("/courses", json={"name": generate_unique_name("Course"), "description": "Embedded"})
+    course = response.get_json()
+
+    assert client.post(f"/students/{student['id']}/courses/{course['id']}").status_code == 200
+    assert client.post(f"/students/{student['id']}/courses/{course['id']}").status_code == 404, \
+        "Duplicate enrollment was accepted"
+    assert client.post(f"/students/{student['id']}/courses/999999999").status_code == 404
+    assert client.get(f"/students/{student['id']}").get_json()["courses"] == [course["name"]]
+
+    assert client.delete(f"/students/{student['id']}/courses/{course['id']}").status_code == 200
+    assert client.delete(f"/students/{student['id']}/courses/{course['id']}").status_code == 404
+
+
+def test_groups_with_max_students(client):
+    """
+    Test the GROUP BY ... HAVING student counts, including groups without students.
+    """
+    empty_group = create_group(client)
+    full_group = create_group(client)
+    for _ in range(2):
+        create_student(client, full_group["id"])
+
+    counts = {g["id"]: g["student_count"] for g in client.get("/groups/with_max_students?max_count=1").get_json()}
+    assert counts[empty_group["id"]] == 0
+    assert full_group["id"] not in counts
+
+    counts = {g["id"]: g["student_count"] for g in client.get("/groups/with_max_students?max_count=2").get_json()}
+    assert counts[full_group["id"]] == 2
+
+    students = client.get("/students?max_group_size=2").get_json()
+    assert sum(s["group_id"] == full_group["id"] for s in students) == 2
+
+
+def test_concurrent_writes(flask_app):
+    """
+    Test that concurrent writers wait for the lock instead of failing with "database is locked".
+    """
+    group = create_group(flask_app.test_client())
+    statuses = []
+
+    def writer():
+        client = flask_app.test_client()
+        for _ in range(20):
+            response = client.post("/students", json={"first_name": "Concurrent", "last_name": "Writer",
+                                                      "group_id": group["id"]})
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [201] * 160, f"Some writes failed: {set(statuses)}"
+
+    roster = flask_app.test_client().get(f"/groups/{group['id']}/students").get_json()
+    assert len(roster["students"]) == 160
@@ -0,0 +1,89 @@
+"""
+In-process tests of the in-memory read model (app/read_model.py).
+"""
+import sys
+import threading
+
+
+def test_readers_during_appends(flask_app):
+    """
+    Test that lock-free readers never see a row whose columns are not written yet while groups and students are added.
+    """
+    from app import read_model
+
+    model = read_model.ReadModel([], [], [], [])
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        try:
+            while not done.is_set():
+                # The row being appended right now
+                newest = len(model.student_ids) + 1
+                model.student(newest)
+                model.group_roster(newest)
+                if newest % 50 == 0:
+                    model.groups_with_max_students(1000)
+        except Exception as error:
+            errors.append(error)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    try:
+        for thread in readers:
+            thread.start()
+        for i in range(1, 5001):
+            with read_model._lock:
+                model.group_saved(i, f"Group-{i}")
+                model.student_saved(i, "Reader", "Race", i, 1)
+    finally:
+        done.set()
+        for thread in readers:
+            thread.join()
+        sys.setswitchinterval(switch_interval)
+
+    assert not errors, f"Readers failed: {errors[:3]}"
+    assert model.group_roster(5000)["students"][0]["id"] == 5000
+
+
+def test_writes_during_reload_are_kept(flask_app, monkeypatch):
+    """
+    Test that a reload does not block writes, and that writes made while the new model is built are replayed on it.
+    """
+    from app import read_model
+
+    old_model = read_model.ReadModel([(1, "Group-1"), (2, "Group-2")], [], [(1, "Reload", "Race", 1, 1)], [])
+    # load() replaces these module globals; monkeypatch restores them afterwards
+    monkeypatch.setattr(read_model, "_model", old_model)
+    monkeypatch.setattr(read_model, "_engine", read_model._engine)
+    monkeypatch.setattr(read_model, "_refresh_seconds", read_model._refresh_seconds)
+    build_started = threading.Event()
+    write_done = threading.Event()
+
+    def slow_load(engine):
+        build_started.set()
+        assert write_done.wait(5), "Write was blocked by the reload"
+        # The snapshot was read before the write committed
+        return read_model.ReadModel([(1, "Group-1"), (2, "Group-2")], [], [(1, "Reload", "Race", 1, 1)], [])
+
+    monkeypatch.setattr(read_model.ReadModel, "load", staticmethod(slow_load))
+    reload = threading.Thread(target=read_model.load, args=(None,))
+    reload.start()
+    try:
+        assert build_started.wait(5)
+        read_model.students_moved([(1, 2)], 2)
+        read_model.student_saved(2, "Reload", "Late", 2, 1)
+        write_done.set()
+    finally:
+        reload.join()
+
+    model = read_model.current()
+    assert model is not old_model
+    assert [s["id"] for s in model.group_roster(2)["students"]] == [1, 2]
+    assert model.student_version(1) == 2
+    assert read_model._pending is None
+
+    # Replaying a write that the snapshot already contains leaves it unchanged
+    model.students_moved([(1, 2)], 2)
+    assert model.student_version(1) == 2